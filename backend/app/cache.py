@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Iterable, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from .logging_manager import logger_manager
+
+PUBLIC_CACHE_TTL = float(os.getenv("PUBLIC_CACHE_TTL", 30))
+PUBLIC_CACHE_MAX_ENTRIES = int(os.getenv("PUBLIC_CACHE_MAX_ENTRIES", 256))
+PUBLIC_MAX_AGE = int(os.getenv("PUBLIC_MAX_AGE", 15))
+PUBLIC_STALE_WHILE_REVALIDATE = int(os.getenv("PUBLIC_STALE_WHILE_REVALIDATE", 30))
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a fixed TTL.
+
+    Every entry carries a set of tags (table names) so that writes can drop
+    all entries derived from the data they touched.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = ()):
+        self._entries[key] = (value, time.monotonic() + self.ttl, frozenset(tags))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *tags: str):
+        stale_keys = [
+            key for key, (_, _, entry_tags) in self._entries.items()
+            if entry_tags.intersection(tags)
+        ]
+        for key in stale_keys:
+            del self._entries[key]
+
+        if stale_keys:
+            logger_manager.debug("Public cache invalidated", {
+                "tags": list(tags),
+                "evicted": len(stale_keys)
+            })
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+def make_cache_key(endpoint: str, **params) -> str:
+    parts = [f"{name}={value}" for name, value in sorted(params.items()) if value is not None]
+    return endpoint + ("?" + "&".join(parts) if parts else "")
+
+
+# Shared cache for the unauthenticated read endpoints
+public_cache = TTLCache(PUBLIC_CACHE_TTL, PUBLIC_CACHE_MAX_ENTRIES)
+
+
+class RenderedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def render_json(content: Any) -> RenderedResponse:
+    body = json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    return RenderedResponse(body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, and proxies may weaken our tags (e.g. gzip)
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def conditional_response(
+    request: Request,
+    rendered: RenderedResponse,
+    max_age: int = PUBLIC_MAX_AGE,
+    stale_while_revalidate: int = PUBLIC_STALE_WHILE_REVALIDATE,
+    private: bool = False
+) -> Response:
+    # Private responses (personal data) may only be kept by the requesting browser
+    if private:
+        cache_control = "private, no-cache"
+    else:
+        cache_control = f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+    headers = {"ETag": rendered.etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match"), rendered.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendered.body, media_type="application/json", headers=headers)
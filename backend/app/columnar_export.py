@@ -0,0 +1,116 @@
+import io
+import os
+import asyncio
+from typing import AsyncIterator, List, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Rows buffered per Parquet row group; Arrow streams send every fetched batch as is
+EXPORT_ROW_GROUP_ROWS = int(os.getenv("EXPORT_ROW_GROUP_ROWS", 65536))
+
+COLUMNAR_EXPORT_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+CATEGORY_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+# UUIDs are written as their canonical strings: this pyarrow has no UUID
+# extension type, and bare 16-byte binaries are not recognized as UUIDs by
+# readers, while strings read back the same as in the CSV exports
+UUID_FIELDS = set()
+
+
+def _uuid_field(name: str, nullable: bool = True) -> pa.Field:
+    UUID_FIELDS.add(name)
+    return pa.field(name, pa.string(), nullable=nullable)
+
+
+REGISTRATION_EXPORT_SCHEMA = pa.schema([
+    _uuid_field("schedule_id", nullable=False),
+    pa.field("passenger_name", pa.string(), nullable=False),
+    pa.field("passenger_phone", pa.string(), nullable=False),
+    pa.field("passenger_email", pa.string()),
+    pa.field("registration_date", pa.date32(), nullable=False),
+    pa.field("departure_time", pa.time64("us"), nullable=False),
+    pa.field("route_type", CATEGORY_TYPE, nullable=False),
+    pa.field("direction", CATEGORY_TYPE, nullable=False),
+    pa.field("shuttle_name", CATEGORY_TYPE),
+    pa.field("company_name", CATEGORY_TYPE),
+    pa.field("status", CATEGORY_TYPE, nullable=False),
+])
+
+SCHEDULE_EXPORT_SCHEMA = pa.schema([
+    _uuid_field("id", nullable=False),
+    _uuid_field("shuttle_id"),
+    pa.field("shuttle_name", CATEGORY_TYPE),
+    pa.field("company_name", CATEGORY_TYPE),
+    pa.field("route_type", CATEGORY_TYPE, nullable=False),
+    pa.field("direction", CATEGORY_TYPE, nullable=False),
+    pa.field("departure_time", pa.time64("us"), nullable=False),
+    pa.field("arrival_time", pa.time64("us")),
+    pa.field("days_of_week", pa.list_(pa.int8())),
+    pa.field("is_active", pa.bool_()),
+])
+
+
+def record_batch(rows: Sequence, schema: pa.Schema) -> pa.RecordBatch:
+    """Convert result rows into a typed record batch, one column per schema field.
+
+    Pure CPU work over a whole partition; callers run it off the event loop.
+    """
+    arrays = []
+    for field in schema:
+        values = [getattr(row, field.name) for row in rows]
+        if field.name in UUID_FIELDS:
+            arrays.append(pa.array([str(value) if value else None for value in values], pa.string()))
+        elif field.type == CATEGORY_TYPE:
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    # The writers keep their own offsets, so the sink can be emptied between writes
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+async def columnar_stream(
+    partitions: AsyncIterator[List], schema: pa.Schema, export_format: str
+) -> AsyncIterator[bytes]:
+    """Encode result partitions as a Parquet file or an Arrow IPC stream, piece by piece."""
+    sink = io.BytesIO()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    pending: List[pa.RecordBatch] = []
+    pending_rows = 0
+    try:
+        async for rows in partitions:
+            batch = await asyncio.to_thread(record_batch, rows, schema)
+            if export_format != "parquet":
+                writer.write_batch(batch)
+                yield _drain(sink)
+                continue
+
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= EXPORT_ROW_GROUP_ROWS:
+                # Encoding a row group is CPU work; pyarrow releases the GIL for it
+                await asyncio.to_thread(writer.write_table, pa.Table.from_batches(pending))
+                pending, pending_rows = [], 0
+                yield _drain(sink)
+
+        if pending:
+            await asyncio.to_thread(writer.write_table, pa.Table.from_batches(pending))
+    finally:
+        # Also when the client disconnects and the stream is closed mid-way
+        writer.close()
+    yield _drain(sink)
@@ -0,0 +1,267 @@
+from typing import AsyncIterator, Awaitable, Callable, List, NamedTuple, Optional, Set, TextIO
+from uuid import UUID
+
+import pandas as pd
+
+from sqlalchemy import select, insert, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import public_cache
+from .csv_parsing import (
+    CSVImportError, RowError, IMPORT_CHUNK_ROWS,
+    read_csv_blocks, parse_blocks, parse_registration_block, parse_schedule_block
+)
+from .seats import reset_trip_seats
+from .models import Shuttle, ShuttleRegistration, ShuttleSchedule, REGISTRATION_TRIP_KEY
+
+
+class RegistrationImportResult(NamedTuple):
+    imported: int
+    updated: int
+    unchanged: int
+    errors: List[RowError]
+
+    @property
+    def message(self) -> str:
+        message = f"Successfully imported {self.imported} registrations"
+        if self.updated:
+            message += f", updated {self.updated}"
+        if self.unchanged:
+            message += f", {self.unchanged} already up to date"
+        if self.errors:
+            message += f". Errors: {'; '.join(map(str, self.errors[:5]))}"  # Show first 5 errors
+        return message
+
+
+class ValidatedChunk(NamedTuple):
+    rows: int
+    valid: pd.DataFrame
+    errors: List[RowError]
+
+
+# Called with the number of rows processed so far after every chunk
+ProgressCallback = Callable[[int], Awaitable[None]]
+
+
+class ScheduleImportResult(NamedTuple):
+    imported: int
+    updated: int
+    unchanged: int
+    errors: List[RowError]
+
+    @property
+    def message(self) -> str:
+        message = f"Successfully imported {self.imported} schedules"
+        if self.updated:
+            message += f", updated {self.updated}"
+        if self.unchanged:
+            message += f", {self.unchanged} already up to date"
+        if self.errors:
+            message += f". Errors: {'; '.join(map(str, self.errors[:5]))}"  # Show first 5 errors
+        return message
+
+
+def _registration_upsert():
+    # Upsert on the trip key so re-uploading a file is idempotent;
+    # rows whose values did not change are not rewritten
+    upsert = pg_insert(ShuttleRegistration)
+    return upsert.on_conflict_do_update(
+        index_elements=REGISTRATION_TRIP_KEY,
+        set_={
+            "passenger_name": upsert.excluded.passenger_name,
+            "passenger_phone": upsert.excluded.passenger_phone,
+            "passenger_email": upsert.excluded.passenger_email,
+            "status": upsert.excluded.status
+        },
+        where=tuple_(
+            ShuttleRegistration.passenger_name,
+            ShuttleRegistration.passenger_phone,
+            ShuttleRegistration.passenger_email,
+            ShuttleRegistration.status
+        ).is_distinct_from(tuple_(
+            upsert.excluded.passenger_name,
+            upsert.excluded.passenger_phone,
+            upsert.excluded.passenger_email,
+            upsert.excluded.status
+        ))
+    ).returning(literal_column("xmax = 0").label("inserted"))
+
+
+# Schedule columns an imported row sets; rows with an id overwrite these
+SCHEDULE_IMPORT_COLUMNS = (
+    "shuttle_id", "route_type", "direction", "departure_time", "arrival_time", "days_of_week", "is_active"
+)
+
+
+def _schedule_upsert():
+    # Rows carrying an id (e.g. an edited export) update that schedule;
+    # rows whose values did not change are not rewritten
+    upsert = pg_insert(ShuttleSchedule)
+    return upsert.on_conflict_do_update(
+        index_elements=[ShuttleSchedule.id],
+        set_={column: upsert.excluded[column] for column in SCHEDULE_IMPORT_COLUMNS},
+        where=tuple_(
+            *(getattr(ShuttleSchedule, column) for column in SCHEDULE_IMPORT_COLUMNS)
+        ).is_distinct_from(tuple_(
+            *(upsert.excluded[column] for column in SCHEDULE_IMPORT_COLUMNS)
+        ))
+    ).returning(literal_column("xmax = 0").label("inserted"))
+
+
+async def _resolve_ids(db: AsyncSession, id_column, ids: Set[str], known: Set[str], unknown: Set[str]):
+    # One IN query for the ids not seen in earlier chunks
+    new_ids = ids - known - unknown
+    if not new_ids:
+        return
+    result = await db.execute(
+        select(id_column).where(id_column.in_([UUID(new_id) for new_id in new_ids]))
+    )
+    found = {str(found_id) for found_id in result.scalars().all()}
+    known |= found
+    unknown |= new_ids - found
+
+
+async def validate_registrations(db: AsyncSession, source: TextIO) -> AsyncIterator[ValidatedChunk]:
+    """Parse and validate the registrations of a CSV text stream without writing.
+
+    Parsing runs in the CSV worker processes; on the event loop every chunk
+    only costs one lookup for the schedules not seen before.
+    """
+    known_schedules, unknown_schedules = set(), set()
+
+    async for parsed in parse_blocks(read_csv_blocks(source, IMPORT_CHUNK_ROWS), parse_registration_block):
+        valid = parsed.data
+        await _resolve_ids(db, ShuttleSchedule.id, set(valid["schedule_id"]), known_schedules, unknown_schedules)
+        missing = valid["schedule_id"].isin(unknown_schedules)
+        errors = parsed.errors + [
+            RowError(index + 1, f"Schedule {schedule_id} not found")
+            for index, schedule_id in valid.loc[missing, "schedule_id"].items()
+        ]
+        yield ValidatedChunk(parsed.rows, valid[~missing], sorted(errors))
+
+
+async def import_registrations(
+    db: AsyncSession, source: TextIO, progress: Optional[ProgressCallback] = None
+) -> RegistrationImportResult:
+    """Validate and upsert the registrations of a CSV text stream, then commit once.
+
+    Costs one batched multi-row INSERT per chunk on top of the validation.
+    """
+    imported = updated = unchanged = 0
+    errors = []
+    touched_schedules = set()
+    upsert = _registration_upsert()
+    processed_rows = 0
+
+    async for chunk in validate_registrations(db, source):
+        processed_rows += chunk.rows
+        errors.extend(chunk.errors)
+        if chunk.valid.empty:
+            if progress:
+                await progress(processed_rows)
+            continue
+
+        valid = chunk.valid
+        records = valid.astype(object).where(valid.notna(), None).to_dict("records")
+        for record in records:
+            record["schedule_id"] = UUID(record["schedule_id"])
+            touched_schedules.add(record["schedule_id"])
+
+        # insertmanyvalues sends these as multi-row INSERT statements
+        result = await db.execute(upsert, records)
+        inserted_flags = result.scalars().all()
+        imported += sum(1 for inserted in inserted_flags if inserted)
+        updated += sum(1 for inserted in inserted_flags if not inserted)
+        unchanged += len(records) - len(inserted_flags)
+        if progress:
+            await progress(processed_rows)
+
+    if imported or updated:
+        # Imported rows bypass the seat counters; re-seed them in the same transaction
+        await reset_trip_seats(db, touched_schedules)
+        await db.commit()
+        public_cache.invalidate("registrations")
+
+    return RegistrationImportResult(imported, updated, unchanged, errors)
+
+
+async def validate_schedules(
+    db: AsyncSession, source: TextIO, default_shuttle_id: Optional[UUID] = None
+) -> AsyncIterator[ValidatedChunk]:
+    """Parse and validate the schedules of a CSV text stream without writing.
+
+    Rows without a shuttle_id belong to `default_shuttle_id` (the shuttle a
+    background job was started for).
+    """
+    known_shuttles, unknown_shuttles = set(), set()
+
+    blocks = read_csv_blocks(source, IMPORT_CHUNK_ROWS)
+    async for parsed in parse_blocks(blocks, parse_schedule_block, default_shuttle_id is None):
+        valid = parsed.data
+        if default_shuttle_id is not None:
+            valid = valid.assign(shuttle_id=valid["shuttle_id"].fillna(str(default_shuttle_id)))
+
+        await _resolve_ids(db, Shuttle.id, set(valid["shuttle_id"]), known_shuttles, unknown_shuttles)
+        missing = valid["shuttle_id"].isin(unknown_shuttles)
+        errors = parsed.errors + [
+            RowError(index + 1, f"Shuttle {shuttle_id} not found")
+            for index, shuttle_id in valid.loc[missing, "shuttle_id"].items()
+        ]
+        yield ValidatedChunk(parsed.rows, valid[~missing], sorted(errors))
+
+
+async def import_schedules(
+    db: AsyncSession,
+    source: TextIO,
+    default_shuttle_id: Optional[UUID] = None,
+    progress: Optional[ProgressCallback] = None
+) -> ScheduleImportResult:
+    """Import the schedules of a CSV text stream, then commit once.
+
+    Rows with an id are upserted on it, so an edited export can be imported
+    back; the others are added. Costs at most one batched multi-row INSERT
+    of each kind per chunk on top of the validation.
+    """
+    imported = updated = unchanged = 0
+    processed_rows = 0
+    errors = []
+    schedule_insert = insert(ShuttleSchedule)
+    upsert = _schedule_upsert()
+
+    async for chunk in validate_schedules(db, source, default_shuttle_id):
+        processed_rows += chunk.rows
+        errors.extend(chunk.errors)
+
+        if not chunk.valid.empty:
+            valid = chunk.valid
+            records = valid.astype(object).where(valid.notna(), None).to_dict("records")
+            new_records, known_records = [], []
+            for record in records:
+                record["shuttle_id"] = UUID(record["shuttle_id"])
+                if record["id"] is None:
+                    del record["id"]
+                    new_records.append(record)
+                else:
+                    record["id"] = UUID(record["id"])
+                    known_records.append(record)
+
+            # Sent to the database before the next chunk is read
+            if new_records:
+                await db.execute(schedule_insert, new_records)
+                imported += len(new_records)
+            if known_records:
+                result = await db.execute(upsert, known_records)
+                inserted_flags = result.scalars().all()
+                imported += sum(1 for inserted in inserted_flags if inserted)
+                updated += sum(1 for inserted in inserted_flags if not inserted)
+                unchanged += len(known_records) - len(inserted_flags)
+
+        if progress:
+            await progress(processed_rows)
+
+    if imported or updated:
+        await db.commit()
+        public_cache.invalidate("schedules")
+
+    return ScheduleImportResult(imported, updated, unchanged, errors)
@@ -0,0 +1,194 @@
+import os
+import socket
+import asyncio
+from datetime import timedelta
+from typing import List, NamedTuple, Optional, Set
+from uuid import UUID, uuid4
+
+from sqlalchemy import update, func
+
+from .database import async_session
+from .models import CSVProcessingLog
+from .csv_import import import_registrations, import_schedules
+from .logging_manager import logger_manager
+
+CSV_JOB_WORKERS = int(os.getenv("CSV_JOB_WORKERS", 2))
+CSV_JOB_QUEUE_SIZE = int(os.getenv("CSV_JOB_QUEUE_SIZE", 20))
+# Jobs renew their lease this often; a job whose lease is older than
+# CSV_JOB_LEASE_SECONDS lost its instance and is failed by any replica
+CSV_JOB_HEARTBEAT_SECONDS = float(os.getenv("CSV_JOB_HEARTBEAT_SECONDS", 30))
+CSV_JOB_LEASE_SECONDS = float(os.getenv("CSV_JOB_LEASE_SECONDS", 120))
+# Must be storage shared by all replicas: a file may be processed by another one than received it
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+
+CSV_IMPORT_TYPES = ("schedules", "registrations")
+# Row errors kept in csv_processing_logs.error_message
+CSV_JOB_MAX_ERRORS = 20
+# Jobs in these states are owned by the queue and workers of one instance
+UNFINISHED_STATUSES = ("pending", "processing")
+
+
+async def _fail_jobs(message: str, *conditions) -> int:
+    """Mark unfinished jobs as failed, so files can be deleted and clients stop polling."""
+    async with async_session() as session:
+        result = await session.execute(
+            update(CSVProcessingLog)
+            .where(CSVProcessingLog.status.in_(UNFINISHED_STATUSES), *conditions)
+            .values(status="error", error_message=message)
+        )
+        await session.commit()
+    if result.rowcount:
+        logger_manager.warning("CSV jobs interrupted", {"jobs": result.rowcount, "reason": message})
+    return result.rowcount
+
+
+async def _fail_expired_jobs() -> int:
+    # Progress updates count as a heartbeat too (greatest() skips NULLs)
+    lease_time = func.greatest(CSVProcessingLog.heartbeat_at, CSVProcessingLog.updated_at)
+    return await _fail_jobs(
+        "Import interrupted: the server running it stopped",
+        lease_time < func.now() - timedelta(seconds=CSV_JOB_LEASE_SECONDS)
+    )
+
+
+class CSVJob(NamedTuple):
+    log_id: UUID
+    shuttle_id: UUID
+    path: str
+    import_type: str
+
+
+async def _update_log(log_id: UUID, **values):
+    # Own short transaction, so progress is visible while the import is still uncommitted
+    async with async_session() as session:
+        await session.execute(
+            update(CSVProcessingLog)
+            .where(CSVProcessingLog.id == log_id)
+            .values(**values)
+        )
+        await session.commit()
+
+
+class CSVJobRunner:
+    """Runs uploaded CSV imports on a fixed number of background workers.
+
+    Jobs wait in a bounded queue; `submit` refuses new ones when it is full
+    instead of piling up work. The state of every job is written to its
+    csv_processing_logs row, which clients poll. Rows carry a lease
+    (owner + heartbeat_at) that this instance renews while it holds the
+    job, so replicas only ever fail jobs whose instance is gone.
+    """
+
+    def __init__(self, workers: int = CSV_JOB_WORKERS, queue_size: int = CSV_JOB_QUEUE_SIZE):
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._worker_count = workers
+        self._queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._running: Set[UUID] = set()
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self._worker_count)]
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+        # Taken before cancelling: the workers forget their job as they unwind
+        interrupted = list(self._running)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._running.clear()
+
+        while self._queue is not None and not self._queue.empty():
+            interrupted.append(self._queue.get_nowait().log_id)
+        self._queue = None
+        if interrupted:
+            try:
+                await _fail_jobs("Import interrupted by a server shutdown", CSVProcessingLog.id.in_(interrupted))
+            except Exception as e:
+                # Their leases run out and another replica fails them
+                logger_manager.warning("Could not fail interrupted CSV jobs", {"error": str(e)})
+
+    async def _heartbeat(self):
+        # Also runs once at startup: jobs of instances that died meanwhile are failed
+        while True:
+            try:
+                await self._renew_leases()
+                await _fail_expired_jobs()
+            except Exception as e:
+                logger_manager.warning("CSV job heartbeat failed", {"error": str(e)})
+            await asyncio.sleep(CSV_JOB_HEARTBEAT_SECONDS)
+
+    async def _renew_leases(self):
+        async with async_session() as session:
+            await session.execute(
+                update(CSVProcessingLog)
+                .where(
+                    CSVProcessingLog.owner == self.instance_id,
+                    CSVProcessingLog.status.in_(UNFINISHED_STATUSES)
+                )
+                .values(heartbeat_at=func.now())
+            )
+            await session.commit()
+
+    def submit(self, job: CSVJob) -> bool:
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            self._running.add(job.log_id)
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger_manager.warning("CSV job bookkeeping failed", {"job_id": str(job.log_id), "error": str(e)})
+            finally:
+                self._running.discard(job.log_id)
+                self._queue.task_done()
+
+    async def _run(self, job: CSVJob):
+        await _update_log(job.log_id, status="processing")
+
+        async def progress(processed_rows: int):
+            await _update_log(job.log_id, processed_rows=processed_rows)
+
+        try:
+            with open(job.path, encoding='utf-8', newline='') as source:
+                async with async_session() as session:
+                    if job.import_type == "registrations":
+                        result = await import_registrations(session, source, progress=progress)
+                    else:
+                        result = await import_schedules(session, source, default_shuttle_id=job.shuttle_id, progress=progress)
+        except Exception as e:
+            logger_manager.warning("CSV job failed", {"job_id": str(job.log_id), "error": str(e)})
+            await _update_log(job.log_id, status="error", error_message=str(e))
+            return
+
+        logger_manager.info("CSV job finished", {"job_id": str(job.log_id), "imported": result.imported})
+        await _update_log(
+            job.log_id,
+            status="success",
+            error_message="; ".join(map(str, result.errors[:CSV_JOB_MAX_ERRORS])) or None
+        )
+
+
+csv_jobs = CSVJobRunner()
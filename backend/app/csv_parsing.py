@@ -0,0 +1,324 @@
+import io
+import os
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+import pandas as pd
+
+# Parsing and validation run in worker processes, so this module only depends on
+# pandas: the workers import it without the database and web layers.
+
+IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", 5000))
+CSV_PARSE_WORKERS = int(os.getenv("CSV_PARSE_WORKERS", 2))
+# Blocks of one import parsed ahead of the database; reading stops while this many are pending
+CSV_PARSE_MAX_PENDING = int(os.getenv("CSV_PARSE_MAX_PENDING", 2))
+
+REGISTRATION_REQUIRED_COLUMNS = ['schedule_id', 'passenger_name', 'passenger_phone', 'registration_date']
+REGISTRATION_IMPORT_STATUSES = ['confirmed', 'cancelled', 'completed']
+SCHEDULE_REQUIRED_COLUMNS = ['route_type', 'direction', 'departure_time']
+SCHEDULE_ACTIVE_VALUES = ['true', 't', 'yes', 'y', '1']
+SCHEDULE_INACTIVE_VALUES = ['false', 'f', 'no', 'n', '0']
+SCHEDULE_DEFAULT_DAYS = [1, 2, 3, 4, 5]
+DAYS_OF_WEEK_PATTERN = r'[\[{(]?\s*\d(\s*[,; ]\s*\d)*\s*[\]})]?'
+UUID_PATTERN = r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+
+
+class CSVImportError(ValueError):
+    """The file as a whole cannot be imported (e.g. required columns are missing)."""
+
+
+class CSVBlock(NamedTuple):
+    header: str
+    text: str
+    first_row: int
+
+
+class RowError(NamedTuple):
+    row: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"Row {self.row}: {self.message}"
+
+
+class ParsedChunk(NamedTuple):
+    rows: int
+    data: Any
+    errors: List[RowError]
+
+
+def _records(lines: Iterable[str]) -> Iterator[str]:
+    # A line break inside a quoted field leaves an odd number of quotes behind
+    record = []
+    quotes = 0
+    for line in lines:
+        if not record and not line.strip():
+            continue
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield ''.join(record)
+            record = []
+            quotes = 0
+    if record:
+        yield ''.join(record)
+
+
+def read_csv_blocks(source: TextIO, chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator[CSVBlock]:
+    """Split a CSV text stream into blocks of whole records, without parsing them.
+
+    Every block carries the header, so it can be parsed on its own. A file
+    without data rows still yields one empty block to check the header.
+    """
+    records = _records(source)
+    header = next(records, None)
+    if header is None:
+        raise CSVImportError("CSV file is empty")
+
+    block = []
+    first_row = 0
+    for record in records:
+        block.append(record)
+        if len(block) == chunk_rows:
+            yield CSVBlock(header, ''.join(block), first_row)
+            first_row += len(block)
+            block = []
+    if block or first_row == 0:
+        yield CSVBlock(header, ''.join(block), first_row)
+
+
+def _read_block(block: CSVBlock, as_text: bool) -> pd.DataFrame:
+    source = io.StringIO(block.header + block.text)
+    if as_text:
+        # Coercion happens per column, and phone numbers keep their leading zeros
+        chunk = pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[''])
+    else:
+        chunk = pd.read_csv(source)
+    chunk.index += block.first_row
+    return chunk
+
+
+def _text_column(chunk: pd.DataFrame, name: str) -> pd.Series:
+    if name not in chunk.columns:
+        return pd.Series(pd.NA, index=chunk.index, dtype="string")
+    return chunk[name].astype("string").str.strip().replace("", pd.NA)
+
+
+def _first_errors(index: pd.Index, checks: List[Tuple[pd.Series, str]]) -> pd.Series:
+    # The first failing check of every row, NA for valid rows
+    error = pd.Series(pd.NA, index=index, dtype="string")
+    for failed, message in checks:
+        error = error.mask(error.isna() & failed.fillna(True).astype(bool), message)
+    return error
+
+
+def _parse_dates(column: pd.Series) -> pd.Series:
+    # Every value is parsed on its own, so the result never depends on the
+    # first value of the chunk: ISO dates (the export format) in one vectorized
+    # pass, anything else through the per-value parser, like the old importer
+    iso = column.str.fullmatch(r"\d{4}-\d{2}-\d{2}([ T].*)?").fillna(False)
+    dates = pd.to_datetime(column.where(iso), format="ISO8601", errors="coerce")
+    rest = column.notna() & ~iso
+    if rest.any():
+        dates[rest] = pd.to_datetime(column[rest], format="mixed", errors="coerce")
+    return dates
+
+
+def validate_registration_chunk(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, List[RowError]]:
+    """Coerce and validate a chunk of registration rows column-wise.
+
+    Returns the valid rows (one per passenger and trip, the last one winning)
+    and the row errors.
+    """
+    missing_columns = [col for col in REGISTRATION_REQUIRED_COLUMNS if col not in chunk.columns]
+    if missing_columns:
+        raise CSVImportError(f"Missing required columns: {missing_columns}")
+
+    rows = pd.DataFrame({
+        "schedule_id": _text_column(chunk, "schedule_id").str.lower(),
+        "passenger_name": _text_column(chunk, "passenger_name"),
+        "passenger_phone": _text_column(chunk, "passenger_phone"),
+        "passenger_email": _text_column(chunk, "passenger_email"),
+        "registration_date": _parse_dates(_text_column(chunk, "registration_date")),
+        "status": _text_column(chunk, "status").fillna("confirmed"),
+    }, index=chunk.index)
+    phone_key = rows["passenger_phone"].str.replace(r"\D", "", regex=True)
+
+    error = _first_errors(rows.index, [
+        (~rows["schedule_id"].str.fullmatch(UUID_PATTERN), "Invalid schedule_id"),
+        (rows["passenger_name"].isna(), "Missing passenger_name"),
+        (phone_key.isna() | (phone_key == ""), "Invalid passenger_phone"),
+        (rows["registration_date"].isna(), "Invalid registration_date"),
+        (~rows["status"].isin(REGISTRATION_IMPORT_STATUSES), "Invalid status"),
+    ])
+    errors = [RowError(index + 1, message) for index, message in error.dropna().items()]
+
+    valid = rows.assign(phone_key=phone_key)[error.isna()]
+    valid["registration_date"] = valid["registration_date"].dt.date
+
+    # A passenger listed twice for the same trip keeps its last row; the trip
+    # is the date, so rows of one day at different times are duplicates too
+    trip_key = [valid["schedule_id"], valid["registration_date"], valid["phone_key"]]
+    kept_row = valid.index.to_series().groupby(trip_key).transform("last")
+    duplicate = kept_row != valid.index
+    errors = sorted(errors + [
+        RowError(index + 1, f"Duplicate of row {kept + 1} (same passenger and trip)")
+        for index, kept in kept_row[duplicate].items()
+    ])
+    return valid[~duplicate].drop(columns="phone_key"), errors
+
+
+def parse_registration_block(block: CSVBlock) -> ParsedChunk:
+    chunk = _read_block(block, as_text=True)
+    valid, errors = validate_registration_chunk(chunk)
+    return ParsedChunk(len(chunk), valid, errors)
+
+
+def _parse_times(column: pd.Series) -> pd.Series:
+    # Plain "H:MM[:SS]" values parse as one vectorized timedelta conversion;
+    # only the rest (e.g. "7:30 PM") goes through the slower datetime parser
+    text = column.where(~column.str.fullmatch(r"\d{1,2}:\d{2}").fillna(False), column + ":00")
+    offsets = pd.to_timedelta(text.where(text.str.fullmatch(r"\d{1,2}:\d{2}:\d{2}").fillna(False)), errors="coerce")
+    offsets = offsets.where((offsets >= pd.Timedelta(0)) & (offsets < pd.Timedelta(days=1)))
+    times = (pd.Timestamp(0) + offsets).dt.time.copy()
+
+    rest = column.notna() & offsets.isna()
+    if rest.any():
+        times[rest] = pd.to_datetime(column[rest], format="mixed", errors="coerce").dt.time
+    return times.where(times.notna(), None)
+
+
+def _parse_days(column: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    # "[1,2,3]", "1,2,3", "{1,2}" or "1 2 3"; returns the day lists and the invalid rows
+    well_formed = column.str.fullmatch(DAYS_OF_WEEK_PATTERN).fillna(False)
+    invalid = column.notna() & (~well_formed | column.str.contains(r"[089]").fillna(False))
+
+    # Each row becomes a weekday bitmask; timetables only use a handful of
+    # distinct masks, so the lists are built once per mask
+    masks = pd.Series(0, index=column.index)
+    for day in range(1, 8):
+        masks += column.str.contains(str(day), regex=False).fillna(False).astype(int) * (1 << day)
+    day_lists = masks.map({
+        mask: [day for day in range(1, 8) if mask & (1 << day)] for mask in masks.unique()
+    })
+    # Rows without days_of_week run on the column default
+    defaults = pd.Series([SCHEDULE_DEFAULT_DAYS] * len(column), index=column.index, dtype=object)
+    return day_lists.where(column.notna(), defaults), invalid
+
+
+def validate_schedule_chunk(chunk: pd.DataFrame, require_shuttle_id: bool = True) -> Tuple[pd.DataFrame, List[RowError]]:
+    """Coerce and validate a chunk of schedule rows column-wise.
+
+    Returns the valid rows as ShuttleSchedule column values (shuttle_id NA
+    for rows without one) and the row errors. The id is NA for rows that add
+    a schedule; rows that carry one (e.g. from the schedule export) update it.
+    """
+    required_columns = (['shuttle_id'] if require_shuttle_id else []) + SCHEDULE_REQUIRED_COLUMNS
+    missing_columns = [col for col in required_columns if col not in chunk.columns]
+    if missing_columns:
+        raise CSVImportError(f"Missing required columns: {missing_columns}")
+
+    shuttle_id = _text_column(chunk, "shuttle_id").str.lower()
+    departure = _text_column(chunk, "departure_time")
+    arrival = _text_column(chunk, "arrival_time")
+    days_of_week, invalid_days = _parse_days(_text_column(chunk, "days_of_week"))
+    is_active = _text_column(chunk, "is_active").str.lower()
+    rows = pd.DataFrame({
+        "id": _text_column(chunk, "id").str.lower(),
+        "shuttle_id": shuttle_id,
+        "route_type": _text_column(chunk, "route_type"),
+        "direction": _text_column(chunk, "direction"),
+        "departure_time": _parse_times(departure),
+        "arrival_time": _parse_times(arrival),
+        "days_of_week": days_of_week,
+        "is_active": ~is_active.isin(SCHEDULE_INACTIVE_VALUES).fillna(False),
+    }, index=chunk.index)
+
+    error = _first_errors(rows.index, [
+        (rows["id"].notna() & ~rows["id"].str.fullmatch(UUID_PATTERN).fillna(False), "Invalid id"),
+        (
+            ~shuttle_id.str.fullmatch(UUID_PATTERN) if require_shuttle_id
+            else shuttle_id.notna() & ~shuttle_id.str.fullmatch(UUID_PATTERN).fillna(False),
+            "Invalid shuttle_id"
+        ),
+        (rows["route_type"].isna() | (rows["route_type"].str.len() > 50), "Invalid route_type"),
+        (rows["direction"].isna() | (rows["direction"].str.len() > 50), "Invalid direction"),
+        (rows["departure_time"].isna(), "Invalid departure_time"),
+        (arrival.notna() & rows["arrival_time"].isna(), "Invalid arrival_time"),
+        (invalid_days, "Invalid days_of_week"),
+        (is_active.notna() & ~is_active.isin(SCHEDULE_ACTIVE_VALUES + SCHEDULE_INACTIVE_VALUES), "Invalid is_active"),
+    ])
+    errors = [RowError(index + 1, message) for index, message in error.dropna().items()]
+    valid = rows[error.isna()]
+    # A schedule listed twice keeps its last row
+    return valid[valid["id"].isna() | ~valid["id"].duplicated(keep="last")], errors
+
+
+def parse_schedule_block(block: CSVBlock, require_shuttle_id: bool = True) -> ParsedChunk:
+    chunk = _read_block(block, as_text=True)
+    valid, errors = validate_schedule_chunk(chunk, require_shuttle_id)
+    return ParsedChunk(len(chunk), valid, errors)
+
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        # Spawned, not forked: the workers must not inherit the event loop or pool sockets
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=CSV_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _parse_pool
+
+
+def shutdown_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+def _discard_parse_pool(pool: ProcessPoolExecutor):
+    # A pool whose worker died stays broken; the next import starts a fresh one
+    global _parse_pool
+    pool.shutdown(wait=False, cancel_futures=True)
+    if _parse_pool is pool:
+        _parse_pool = None
+
+
+async def parse_blocks(
+    blocks: Iterator[CSVBlock], parse: Callable[..., ParsedChunk], *args
+) -> AsyncIterator[ParsedChunk]:
+    """Parse blocks in the worker processes and yield the results in file order.
+
+    At most CSV_PARSE_MAX_PENDING blocks are in flight, so reading the file
+    waits for the consumer (the database inserts) instead of running ahead.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_parse_pool()
+    pending = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < CSV_PARSE_MAX_PENDING:
+                # Reading the source is blocking file I/O too
+                block = await asyncio.to_thread(next, blocks, None)
+                if block is None:
+                    exhausted = True
+                else:
+                    pending.append(loop.run_in_executor(pool, parse, block, *args))
+            if not pending:
+                return
+            yield await pending.popleft()
+    except BrokenProcessPool:
+        _discard_parse_pool(pool)
+        raise CSVImportError("The file could not be parsed, a parser process stopped unexpectedly")
+    finally:
+        for future in pending:
+            future.cancel()
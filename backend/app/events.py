@@ -0,0 +1,121 @@
+import os
+import json
+import asyncio
+from typing import Optional, Set
+
+import asyncpg
+
+from .database import DATABASE_URL
+from .cache import public_cache
+from .logging_manager import logger_manager
+
+CHANGE_CHANNEL = "shuttle_changes"
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", 100))
+EVENT_RECONNECT_DELAY = float(os.getenv("EVENT_RECONNECT_DELAY", 5))
+
+# Public cache tags affected by a change on each table
+TABLE_CACHE_TAGS = {
+    "companies": "companies",
+    "shuttles": "shuttles",
+    "shuttle_schedules": "schedules",
+    "shuttle_registrations": "registrations",
+    "standing_registrations": "registrations",
+}
+
+
+class ChangeFeed:
+    """Fans out Postgres NOTIFY events from the shared change channel.
+
+    Every replica holds one LISTEN connection, so a write on any replica
+    reaches the push clients (and invalidates the public cache) of all of them.
+    """
+
+    def __init__(self):
+        self._connection: Optional[asyncpg.Connection] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def start(self):
+        self._closing = False
+        try:
+            await self._listen()
+        except Exception as e:
+            logger_manager.warning("Change feed unavailable at startup", {"error": str(e)})
+            self._schedule_reconnect()
+
+    async def stop(self):
+        self._closing = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    async def _listen(self):
+        # LISTEN needs a dedicated session, so this connection lives outside the pools
+        self._connection = await asyncpg.connect(
+            DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+        )
+        self._connection.add_termination_listener(self._on_terminated)
+        await self._connection.add_listener(CHANGE_CHANNEL, self._on_notify)
+        logger_manager.info("Change feed listening", {"channel": CHANGE_CHANNEL})
+
+    def _on_terminated(self, connection):
+        if not self._closing:
+            logger_manager.warning("Change feed connection lost")
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while not self._closing:
+            await asyncio.sleep(EVENT_RECONNECT_DELAY)
+            try:
+                await self._listen()
+                # Anything may have changed while we were disconnected
+                public_cache.clear()
+                self.publish({"table": "*", "op": "resync"})
+                return
+            except Exception as e:
+                logger_manager.warning("Change feed reconnect failed", {"error": str(e)})
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger_manager.warning("Ignoring malformed change event", {"payload": payload})
+            return
+
+        tag = TABLE_CACHE_TAGS.get(event.get("table"))
+        if tag:
+            public_cache.invalidate(tag)
+        self.publish(event)
+
+    def publish(self, event: dict):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: drop the backlog and ask it to refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"table": "*", "op": "resync"})
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,100 @@
+import os
+import heapq
+import time
+import uuid
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+SEAT_HOLD_TTL = int(os.getenv("SEAT_HOLD_TTL", 300))
+SEAT_HOLD_MAX_TTL = int(os.getenv("SEAT_HOLD_MAX_TTL", 900))
+# How often seats of expired holds are offered to the waitlist
+SEAT_HOLD_SWEEP_SECONDS = float(os.getenv("SEAT_HOLD_SWEEP_SECONDS", 15))
+
+TripKey = Tuple[UUID, date]
+
+
+class SeatHold(NamedTuple):
+    hold_id: str
+    trip: TripKey
+    expires_at: float
+
+
+class SeatHolds:
+    """In-memory seat holds per trip, evicted through an expiry min-heap.
+
+    Holds never touch the database; only confirming one writes a
+    registration (through the regular capacity-checked booking path).
+    Expired entries are dropped lazily whenever the structure is used.
+    """
+
+    def __init__(self):
+        self._holds: Dict[str, SeatHold] = {}
+        self._held: Dict[TripKey, int] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        # Trips that got seats back from expired holds, for the waitlist
+        self._expired_trips: Set[TripKey] = set()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, hold_id = heapq.heappop(self._expiry)
+            hold = self._holds.get(hold_id)
+            # Released or re-added holds leave stale heap entries behind
+            if hold is not None and hold.expires_at == expires_at:
+                self._remove(hold)
+                self._expired_trips.add(hold.trip)
+
+    def _remove(self, hold: SeatHold):
+        del self._holds[hold.hold_id]
+        remaining = self._held[hold.trip] - 1
+        if remaining:
+            self._held[hold.trip] = remaining
+        else:
+            del self._held[hold.trip]
+
+    def _add(self, hold: SeatHold):
+        self._holds[hold.hold_id] = hold
+        self._held[hold.trip] = self._held.get(hold.trip, 0) + 1
+        heapq.heappush(self._expiry, (hold.expires_at, hold.hold_id))
+
+    def held(self, trip: TripKey) -> int:
+        self._evict_expired()
+        return self._held.get(trip, 0)
+
+    def create(self, trip: TripKey, ttl: int = SEAT_HOLD_TTL) -> SeatHold:
+        self._evict_expired()
+        hold = SeatHold(uuid.uuid4().hex, trip, time.monotonic() + min(ttl, SEAT_HOLD_MAX_TTL))
+        self._add(hold)
+        return hold
+
+    def get(self, hold_id: str) -> Optional[SeatHold]:
+        self._evict_expired()
+        return self._holds.get(hold_id)
+
+    def release(self, hold_id: str) -> Optional[SeatHold]:
+        hold = self.get(hold_id)
+        if hold is not None:
+            self._remove(hold)
+        return hold
+
+    def restore(self, hold: SeatHold):
+        # Put back a hold taken for a confirmation that did not go through
+        if hold.hold_id not in self._holds and hold.expires_at > time.monotonic():
+            self._add(hold)
+
+    def take_expired_trips(self) -> Set[TripKey]:
+        """Trips whose holds expired since the last call."""
+        self._evict_expired()
+        trips, self._expired_trips = self._expired_trips, set()
+        return trips
+
+    def requeue_expired_trips(self, trips: List[TripKey]):
+        self._expired_trips.update(trips)
+
+    @staticmethod
+    def seconds_left(hold: SeatHold) -> int:
+        return max(int(hold.expires_at - time.monotonic()), 0)
+
+
+seat_holds = SeatHolds()
@@ -0,0 +1,270 @@
+import os
+import asyncio
+import hashlib
+from typing import NamedTuple, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import TTLCache
+from .database import get_db_connection
+from .logging_manager import logger_manager
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 86400))
+IDEMPOTENCY_CACHE_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_CACHE_MAX_ENTRIES", 1024))
+# A claimed key whose request never finished (crashed replica) frees up after this long;
+# the replica running the request renews its claim every third of it
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 60))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Authentication failures depend on the token, not the request; a retry with a valid one must run
+UNRECORDED_STATUS_CODES = {401, 403}
+SKIP_RECORD_STATE = "idempotency_skip_record"
+IDEMPOTENT_PATH_PREFIXES = (
+    "/api/registrations",
+    "/api/standing-registrations",
+    "/api/companies",
+    "/api/shuttles",
+    "/api/schedules",
+)
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    body: bytes
+    content_type: str
+
+
+# Completed responses only; in-flight claims live in the table so every replica sees them
+stored_responses = TTLCache(IDEMPOTENCY_TTL, IDEMPOTENCY_CACHE_MAX_ENTRIES)
+
+
+async def _claim(key: str, request_hash: str) -> bool:
+    # Takes the key unless a live record exists; expired and abandoned ones are reclaimed
+    async with get_db_connection() as conn:
+        claimed = await conn.fetchval(
+            """
+            INSERT INTO idempotency_keys (key, request_hash) VALUES ($1, $2)
+            ON CONFLICT (key) DO UPDATE SET
+                request_hash = EXCLUDED.request_hash,
+                status_code = NULL,
+                response_body = NULL,
+                content_type = NULL,
+                created_at = CURRENT_TIMESTAMP
+            WHERE idempotency_keys.created_at < CURRENT_TIMESTAMP - make_interval(secs => $3)
+               OR (idempotency_keys.status_code IS NULL
+                   AND idempotency_keys.created_at < CURRENT_TIMESTAMP - make_interval(secs => $4))
+            RETURNING key
+            """,
+            key, request_hash, IDEMPOTENCY_TTL, IDEMPOTENCY_LOCK_TIMEOUT
+        )
+    return claimed is not None
+
+
+async def _load(key: str) -> Optional[StoredResponse]:
+    async with get_db_connection() as conn:
+        row = await conn.fetchrow(
+            "SELECT request_hash, status_code, response_body, content_type FROM idempotency_keys WHERE key = $1",
+            key
+        )
+    if row is None:
+        return None
+    return StoredResponse(row["request_hash"], row["status_code"], row["response_body"], row["content_type"])
+
+
+async def _complete(key: str, response: StoredResponse):
+    async with get_db_connection() as conn:
+        await conn.execute(
+            """
+            UPDATE idempotency_keys SET status_code = $2, response_body = $3, content_type = $4
+            WHERE key = $1
+            """,
+            key, response.status_code, response.body, response.content_type
+        )
+    stored_responses.set(key, response)
+
+
+async def _renew_claim(key: str):
+    async with get_db_connection() as conn:
+        await conn.execute(
+            "UPDATE idempotency_keys SET created_at = CURRENT_TIMESTAMP WHERE key = $1 AND status_code IS NULL",
+            key
+        )
+
+
+async def _keep_claimed(key: str):
+    # However long the first request runs, retries keep getting a 409 instead of reclaiming the key
+    while True:
+        await asyncio.sleep(IDEMPOTENCY_LOCK_TIMEOUT / 3)
+        try:
+            await _renew_claim(key)
+        except Exception as e:
+            logger_manager.warning("Could not renew idempotency claim", {"error": str(e)})
+
+
+async def _release(key: str):
+    async with get_db_connection() as conn:
+        await conn.execute("DELETE FROM idempotency_keys WHERE key = $1 AND status_code IS NULL", key)
+
+
+async def purge_expired_idempotency_keys():
+    async with get_db_connection() as conn:
+        await conn.execute(
+            "DELETE FROM idempotency_keys WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => $1)",
+            IDEMPOTENCY_TTL
+        )
+
+
+def skip_idempotent_record(request):
+    """Keep the current response out of the idempotency store (e.g. the handler never ran)."""
+    setattr(request.state, SKIP_RECORD_STATE, True)
+
+
+async def _send_json(send: Send, status_code: int, body: bytes, extra_headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            *extra_headers
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Replays the recorded response of write requests retried with the same Idempotency-Key.
+
+    Keys are scoped to the method, the path and the Authorization header, so
+    one client cannot replay another's responses; reusing a key with another
+    body or query string is a 422. The first request claims the key in the
+    idempotency_keys table and keeps the claim alive while it runs; retries
+    arriving meanwhile get a 409, and later ones get the stored response
+    without reaching the routers.
+    Server errors, authentication failures and requests rejected before
+    reaching their handler are not recorded, so those requests can be retried.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in IDEMPOTENT_METHODS
+            or not scope["path"].startswith(IDEMPOTENT_PATH_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        client_key = headers.get(IDEMPOTENCY_HEADER.encode("latin-1"))
+        if client_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not client_key or len(client_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            await _send_json(send, 400, b'{"error":"Invalid Idempotency-Key header"}')
+            return
+
+        # Buffer the request body: it is part of the fingerprint and replayed to the app
+        body_messages = []
+        request_body = b""
+        while True:
+            message = await receive()
+            body_messages.append(message)
+            if message["type"] != "http.request":
+                break
+            request_body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        scope_line = f'{scope["method"]} {scope["path"]}'.encode("utf-8")
+        query_string = scope.get("query_string", b"")
+        authorization = headers.get(b"authorization", b"")
+        key = hashlib.sha256(scope_line + b"\n" + authorization + b"\n" + client_key).hexdigest()
+        # The query string is part of the request: reusing a key with other parameters is a 422
+        request_hash = hashlib.sha256(scope_line + b"?" + query_string + b"\n" + request_body).hexdigest()
+
+        stored = stored_responses.get(key)
+        if stored is None:
+            try:
+                claimed = await _claim(key, request_hash)
+                if not claimed:
+                    stored = await _load(key)
+            except Exception as e:
+                # Without the key store, writes still go through (just without replay protection)
+                logger_manager.warning("Idempotency store unavailable", {"error": str(e)})
+                await self._run(scope, body_messages, receive, send)
+                return
+
+            if claimed:
+                await self._run_and_record(scope, body_messages, receive, send, key, request_hash)
+                return
+
+        if stored is None or stored.status_code is None:
+            await _send_json(send, 409, b'{"error":"A request with this Idempotency-Key is still being processed"}')
+            return
+
+        if stored.request_hash != request_hash:
+            await _send_json(send, 422, b'{"error":"Idempotency-Key was already used for a different request"}')
+            return
+
+        stored_responses.set(key, stored)
+        await send({
+            "type": "http.response.start",
+            "status": stored.status_code,
+            "headers": [
+                (b"content-type", stored.content_type.encode("latin-1")),
+                (b"content-length", str(len(stored.body)).encode("latin-1")),
+                (b"idempotent-replayed", b"true")
+            ]
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _run(self, scope: Scope, body_messages: list, receive: Receive, send: Send):
+        pending = list(body_messages)
+
+        async def replay_receive() -> Message:
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    async def _run_and_record(
+        self, scope: Scope, body_messages: list, receive: Receive, send: Send, key: str, request_hash: str
+    ):
+        status_code = 500
+        content_type = "application/json"
+        chunks = []
+
+        async def recording_send(message: Message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        # Shared with the request state, where handlers can opt out of recording
+        state = scope.setdefault("state", {})
+        keep_claimed = asyncio.create_task(_keep_claimed(key))
+        try:
+            await self._run(scope, body_messages, receive, recording_send)
+        finally:
+            keep_claimed.cancel()
+            try:
+                recordable = status_code < 500 and status_code not in UNRECORDED_STATUS_CODES
+                if recordable and not state.get(SKIP_RECORD_STATE):
+                    await _complete(key, StoredResponse(request_hash, status_code, b"".join(chunks), content_type))
+                else:
+                    await _release(key)
+            except Exception as e:
+                logger_manager.warning("Could not record idempotent response", {"error": str(e)})
@@ -9,8 +9,15 @@ import time
 import logging
 from dotenv import load_dotenv
 
-from .database import engine, Base, connect_to_database, close_database_connection
-from .routers import auth, companies, shuttles, schedules, registrations, admin, csv_routes
+from .database import engine, Base, connect_to_database, close_database_connection, check_database_health
+from .routers import auth, companies, shuttles, schedules, registrations, admin, csv_routes, events, sync, standing_registrations
+from .events import change_feed
+from .csv_jobs import csv_jobs
+from .csv_parsing import shutdown_parse_pool
+from .holds import SEAT_HOLD_SWEEP_SECONDS
+from .waitlist import promote_after_expired_holds
+from .maintenance import periodic_tasks
+from .idempotency import IdempotencyMiddleware, purge_expired_idempotency_keys, skip_idempotent_record
 from .telemetry import setup_telemetry, instrument_app, cleanup_telemetry
 from .logging_manager import logger_manager
 
@@ -24,6 +31,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Replay responses of write requests retried with the same Idempotency-Key;
+# added before CORS so its own and replayed responses get the CORS headers too
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -71,6 +82,8 @@ async def log_requests(request: Request, call_next):
 # Global exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    # Rejected before the handler ran, so a corrected retry must not get this replayed
+    skip_idempotent_record(request)
     return JSONResponse(
         status_code=422,
         content={"error": "Validation error", "details": exc.errors()}
@@ -96,16 +109,35 @@ async def general_exception_handler(request: Request, exc: Exception):
         content={"error": error_message}
     )
 
+# Housekeeping while the app is up
+periodic_tasks.add("promote_after_expired_holds", SEAT_HOLD_SWEEP_SECONDS, promote_after_expired_holds)
+periodic_tasks.add("purge_expired_tombstones", sync.SYNC_TOMBSTONE_PURGE_SECONDS, sync.purge_expired_tombstones)
+
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
     logger_manager.info("Starting Tzafrir Shuttle API")
     await connect_to_database()
     logger_manager.info("Database connection established")
+    await change_feed.start()
+    await csv_jobs.start()
+    await periodic_tasks.start()
+    try:
+        await sync.purge_expired_tombstones()
+    except Exception as e:
+        logger_manager.warning("Could not purge sync tombstones", {"error": str(e)})
+    try:
+        await purge_expired_idempotency_keys()
+    except Exception as e:
+        logger_manager.warning("Could not purge idempotency keys", {"error": str(e)})
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger_manager.info("Shutting down Tzafrir Shuttle API")
+    await change_feed.stop()
+    await csv_jobs.stop()
+    await periodic_tasks.stop()
+    shutdown_parse_pool()
     await close_database_connection()
     if tracer:
         cleanup_telemetry()
@@ -115,15 +147,10 @@ async def shutdown_event():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    try:
-        # Test database connection
-        from .database import get_db_connection
-        conn = await get_db_connection()
-        await conn.fetchval("SELECT 1")
-        await conn.close()
+    # Cached for HEALTH_CACHE_TTL seconds so probe bursts cost one round trip
+    if await check_database_health():
         return {"status": "healthy", "database": "connected"}
-    except Exception:
-        return {"status": "unhealthy", "database": "disconnected"}
+    return {"status": "unhealthy", "database": "disconnected"}
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -131,8 +158,11 @@ app.include_router(companies.router, prefix="/api/companies", tags=["Companies"]
 app.include_router(shuttles.router, prefix="/api/shuttles", tags=["Shuttles"])
 app.include_router(schedules.router, prefix="/api/schedules", tags=["Schedules"])
 app.include_router(registrations.router, prefix="/api/registrations", tags=["Registrations"])
+app.include_router(standing_registrations.router, prefix="/api/standing-registrations", tags=["Standing Registrations"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 app.include_router(csv_routes.router, prefix="/api/csv", tags=["CSV"])
+app.include_router(events.router, prefix="/api/events", tags=["Events"])
+app.include_router(sync.router, prefix="/api/sync", tags=["Sync"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+
+from .logging_manager import logger_manager
+
+PeriodicJob = Callable[[], Awaitable[object]]
+
+
+class PeriodicTasks:
+    """Runs housekeeping coroutines on fixed intervals while the app is up.
+
+    A failed run is logged and retried at the next interval, so a database
+    that is down only delays the housekeeping.
+    """
+
+    def __init__(self):
+        self._jobs: List[Tuple[str, float, PeriodicJob]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, interval: float, job: PeriodicJob):
+        self._jobs.append((name, interval, job))
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._loop(*job)) for job in self._jobs]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, name: str, interval: float, job: PeriodicJob):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await job()
+            except Exception as e:
+                logger_manager.warning("Periodic task failed", {"task": name, "error": str(e)})
+
+
+periodic_tasks = PeriodicTasks()
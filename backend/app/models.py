@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, Time, ARRAY, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, String, Integer, BigInteger, Boolean, Date, DateTime, Text, Time, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+import re
 import uuid
 from .database import Base
 
@@ -58,10 +59,12 @@ class ShuttleRegistration(Base):
     schedule_id = Column(UUID(as_uuid=True), ForeignKey("shuttle_schedules.id", ondelete="CASCADE"))
     passenger_name = Column(String(255), nullable=False)
     passenger_phone = Column(String(50), nullable=False)
+    # Digits only, so "050-1234567" and "0501234567" are the same passenger
+    passenger_phone_normalized = Column(String(50), Computed("regexp_replace(passenger_phone, '\\D', '', 'g')", persisted=True))
     passenger_email = Column(String(255))
     registration_date = Column(DateTime(timezone=True), nullable=False)
     registration_time = Column(DateTime(timezone=True), server_default=func.now())
-    status = Column(String(50), default="confirmed")  # 'confirmed', 'cancelled', 'completed'
+    status = Column(String(50), default="confirmed")  # 'confirmed', 'waitlisted', 'cancelled', 'completed'
     time_slot = Column(Text)
     route_type = Column(Text)
     direction = Column(Text)
@@ -73,6 +76,63 @@ class ShuttleRegistration(Base):
     # Relationships
     schedule = relationship("ShuttleSchedule", back_populates="registrations")
 
+# One registration per passenger and trip (unique index uq_registrations_trip);
+# also the ON CONFLICT target of registration inserts
+REGISTRATION_TRIP_KEY = [
+    ShuttleRegistration.schedule_id,
+    ShuttleRegistration.registration_date,
+    ShuttleRegistration.passenger_phone_normalized
+]
+
+def normalize_phone(phone: str) -> str:
+    # Same normalization as the passenger_phone_normalized column
+    return re.sub(r"\D", "", phone or "")
+
+class StandingRegistration(Base):
+    __tablename__ = "standing_registrations"
+    
+    # A passenger riding the same schedule on a weekday set over a date range;
+    # expanded per trip date on read, never materialized into registrations
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    schedule_id = Column(UUID(as_uuid=True), ForeignKey("shuttle_schedules.id", ondelete="CASCADE"))
+    passenger_name = Column(String(255), nullable=False)
+    passenger_phone = Column(String(50), nullable=False)
+    passenger_email = Column(String(255))
+    days_of_week = Column(ARRAY(Integer), nullable=False)  # 1=Monday, 7=Sunday
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date)  # open-ended when NULL
+    status = Column(String(50), default="active")  # 'active', 'cancelled'
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    schedule = relationship("ShuttleSchedule")
+
+class CSVProcessingLog(Base):
+    __tablename__ = "csv_processing_logs"
+    
+    # One row per background CSV import job
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    shuttle_id = Column(UUID(as_uuid=True), ForeignKey("shuttles.id", ondelete="CASCADE"), nullable=False)
+    csv_file_name = Column(String(255), nullable=False)
+    status = Column(String(50), default="pending")  # 'pending', 'processing', 'success', 'error'
+    error_message = Column(Text)
+    processed_rows = Column(Integer, default=0)
+    # Lease of the API instance running the job, renewed while it is unfinished
+    owner = Column(String(100))
+    heartbeat_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TripSeat(Base):
+    __tablename__ = "trip_seats"
+    
+    # Seats booked on one departure (schedule + date); see app/seats.py
+    schedule_id = Column(UUID(as_uuid=True), ForeignKey("shuttle_schedules.id", ondelete="CASCADE"), primary_key=True)
+    trip_date = Column(Date, primary_key=True)
+    booked = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class AdminUser(Base):
     __tablename__ = "admin_users"
     
@@ -84,4 +144,13 @@ class AdminUser(Base):
     is_active = Column(Boolean, default=True)
     last_login = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DeletedRecord(Base):
+    __tablename__ = "deleted_records"
+    
+    # Tombstones written by the delete triggers, read by the sync endpoint
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    table_name = Column(String(100), nullable=False)
+    record_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
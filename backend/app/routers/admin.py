@@ -4,7 +4,8 @@ from sqlalchemy import select, update, delete, func
 from typing import List
 from uuid import UUID
 
-from ..database import get_database_session
+from ..database import get_database_session, get_pool_stats
+from ..cache import public_cache
 from ..models import AdminUser, Company, Shuttle, ShuttleSchedule, ShuttleRegistration
 from ..logging_manager import logger_manager
 from ..schemas import (
@@ -238,4 +239,18 @@ async def get_admin_stats(
         "active_shuttles": active_shuttles_result.scalar(),
         "schedules": schedules_result.scalar(),
         "registrations": registrations_result.scalar()
-    }
\ No newline at end of file
+    }
+
+@router.get("/db-pool")
+async def get_db_pool_stats(
+    current_user: AuthUser = Depends(get_current_active_user)
+):
+    # Live connection pool metrics for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW
+    return get_pool_stats()
+
+
+@router.get("/cache")
+async def get_cache_stats(
+    current_user: AuthUser = Depends(get_current_active_user)
+):
+    return public_cache.stats()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 from sqlalchemy.orm import selectinload
@@ -6,6 +6,7 @@ from typing import List
 from uuid import UUID
 
 from ..database import get_database_session
+from ..cache import public_cache, make_cache_key, render_json, conditional_response
 from ..models import Company
 from ..logging_manager import logger_manager
 from ..schemas import Company as CompanySchema, CompanyCreate, CompanyUpdate, MessageResponse
@@ -15,13 +16,21 @@ router = APIRouter()
 
 @router.get("/public", response_model=List[CompanySchema])
 async def get_companies_public(
+    request: Request,
     db: AsyncSession = Depends(get_database_session)
 ):
-    result = await db.execute(
-        select(Company).order_by(Company.name)
-    )
-    companies = result.scalars().all()
-    return companies
+    cache_key = make_cache_key("companies.public")
+    rendered = public_cache.get(cache_key)
+    if rendered is None:
+        result = await db.execute(
+            select(Company).order_by(Company.name)
+        )
+        companies = [CompanySchema.model_validate(company) for company in result.scalars().all()]
+        
+        rendered = render_json(companies)
+        public_cache.set(cache_key, rendered, tags=("companies",))
+    
+    return conditional_response(request, rendered)
 
 @router.get("/", response_model=List[CompanySchema])
 async def get_companies(
@@ -76,6 +85,7 @@ async def create_company(
     db.add(new_company)
     await db.commit()
     await db.refresh(new_company)
+    public_cache.invalidate("companies")
     
     return new_company
 
@@ -108,6 +118,7 @@ async def update_company(
         )
         await db.commit()
         await db.refresh(company)
+        public_cache.invalidate("companies")
     
     return company
 
@@ -134,5 +145,7 @@ async def delete_company(
         delete(Company).where(Company.id == company_id)
     )
     await db.commit()
+    # Shuttles and their schedules are removed by ON DELETE CASCADE
+    public_cache.invalidate("companies", "shuttles", "schedules")
     
     return MessageResponse(message="Company deleted successfully")
\ No newline at end of file
@@ -1,20 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import select, update, literal, cast, Date
+from typing import AsyncIterator, Callable, List, Optional
 import pandas as pd
+import csv
 import io
-from uuid import UUID
+import json
+import os
+from contextlib import aclosing, contextmanager
+from uuid import UUID, uuid4
 from datetime import date
 
-from ..database import get_database_session
-from ..models import ShuttleRegistration, ShuttleSchedule, Shuttle, Company
-from ..schemas import MessageResponse
+from ..database import get_database_session, async_session
+from ..cache import public_cache
+from ..standing import standing_occurrences
+from ..columnar_export import (
+    COLUMNAR_EXPORT_MEDIA_TYPES, REGISTRATION_EXPORT_SCHEMA, SCHEDULE_EXPORT_SCHEMA, columnar_stream
+)
+from ..csv_jobs import csv_jobs, CSVJob, CSV_IMPORT_TYPES, UNFINISHED_STATUSES, UPLOAD_DIR
+from ..csv_import import (
+    CSVImportError, ValidatedChunk, import_registrations, import_schedules, validate_registrations, validate_schedules
+)
+from ..models import ShuttleRegistration, ShuttleSchedule, Shuttle, Company, CSVProcessingLog
+from ..schemas import (
+    MessageResponse, CSVProcessRequest, CSVUploadResponse, CSVJobResponse,
+    CSVProcessingLog as CSVProcessingLogSchema
+)
 from ..auth import get_current_active_user, AdminUser
+from ..logging_manager import logger_manager
 
 router = APIRouter()
 
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 1000))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", 1024 * 1024))
+
+REGISTRATION_EXPORT_COLUMNS = [
+    'Passenger Name', 'Phone', 'Email', 'Date', 'Time', 'Route', 'Direction', 'Shuttle', 'Company', 'Status'
+]
+
+VALIDATION_REPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+@contextmanager
+def _upload_text(file: UploadFile):
+    # Decode the spooled upload as it is read, instead of loading it into memory
+    file.file.seek(0)
+    text = io.TextIOWrapper(file.file, encoding='utf-8', newline='')
+    try:
+        yield text
+    finally:
+        text.detach()
+
 @router.post("/import-registrations", response_model=MessageResponse)
 async def import_registrations_csv(
     file: UploadFile = File(...),
@@ -28,131 +67,210 @@ async def import_registrations_csv(
         )
     
     try:
-        # Read CSV file
-        content = await file.read()
-        csv_data = pd.read_csv(io.StringIO(content.decode('utf-8')))
-        
-        # Validate required columns
-        required_columns = ['schedule_id', 'passenger_name', 'passenger_phone', 'registration_date']
-        missing_columns = [col for col in required_columns if col not in csv_data.columns]
+        # Read the CSV file chunk by chunk
+        with _upload_text(file) as source:
+            result = await import_registrations(db, source)
         
-        if missing_columns:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Missing required columns: {missing_columns}"
-            )
-        
-        imported_count = 0
-        errors = []
-        
-        for index, row in csv_data.iterrows():
-            try:
-                # Verify schedule exists
-                schedule_result = await db.execute(
-                    select(ShuttleSchedule).where(ShuttleSchedule.id == row['schedule_id'])
-                )
-                if not schedule_result.scalar_one_or_none():
-                    errors.append(f"Row {index + 1}: Schedule {row['schedule_id']} not found")
-                    continue
-                
-                # Create registration
-                registration = ShuttleRegistration(
-                    schedule_id=row['schedule_id'],
-                    passenger_name=row['passenger_name'],
-                    passenger_phone=row['passenger_phone'],
-                    passenger_email=row.get('passenger_email'),
-                    registration_date=pd.to_datetime(row['registration_date']).date(),
-                    status=row.get('status', 'confirmed')
-                )
-                
-                db.add(registration)
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {index + 1}: {str(e)}")
-        
-        if imported_count > 0:
-            await db.commit()
-        
-        message = f"Successfully imported {imported_count} registrations"
-        if errors:
-            message += f". Errors: {'; '.join(errors[:5])}"  # Show first 5 errors
-        
-        return MessageResponse(message=message)
+        return MessageResponse(message=result.message)
         
+    except CSVImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing CSV: {str(e)}"
         )
 
+def _check_export_format(export_format: str):
+    if export_format != 'csv' and export_format not in COLUMNAR_EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of {['csv'] + list(COLUMNAR_EXPORT_MEDIA_TYPES)}"
+        )
+
+async def _stream_partitions(session: AsyncSession, queries):
+    """Rows of each query in turn, EXPORT_CHUNK_ROWS at a time, from server-side cursors."""
+    for query in queries:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.partitions():
+            yield rows
+
+def _columnar_response(queries, schema, export_format: str, name: str) -> StreamingResponse:
+    async def export_stream():
+        # Same server-side cursors as the CSV exports; every fetched batch becomes a record batch
+        async with async_session() as session:
+            # aclosing: a client disconnect closes the writers right away, not at garbage collection
+            async with aclosing(columnar_stream(_stream_partitions(session, queries), schema, export_format)) as pieces:
+                async for piece in pieces:
+                    yield piece
+    
+    return StreamingResponse(
+        export_stream(),
+        media_type=COLUMNAR_EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={name}.{export_format}"}
+    )
+
 @router.get("/export-registrations")
 async def export_registrations_csv(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: AsyncSession = Depends(get_database_session),
+    export_format: str = Query('csv', alias="format"),
     current_user: AdminUser = Depends(get_current_active_user)
 ):
+    _check_export_format(export_format)
+    
     # Build query with joins to get related data
-    query = select(
+    registrations = select(
+        ShuttleRegistration.schedule_id,
         ShuttleRegistration.passenger_name,
         ShuttleRegistration.passenger_phone,
         ShuttleRegistration.passenger_email,
-        ShuttleRegistration.registration_date,
+        cast(ShuttleRegistration.registration_date, Date).label('registration_date'),
         ShuttleRegistration.status,
         ShuttleSchedule.departure_time,
         ShuttleSchedule.route_type,
         ShuttleSchedule.direction,
         Shuttle.name.label('shuttle_name'),
         Company.name.label('company_name')
-    ).select_from(
-        ShuttleRegistration
-        .join(ShuttleSchedule)
-        .join(Shuttle)
-        .join(Company)
-    ).where(ShuttleRegistration.status == 'confirmed')
+    ).select_from(ShuttleRegistration).join(ShuttleSchedule).join(Shuttle).join(Company).where(
+        ShuttleRegistration.status == 'confirmed'
+    ).order_by(ShuttleRegistration.registration_date)
     
     # Add date filters if provided
     if start_date:
-        query = query.where(ShuttleRegistration.registration_date >= start_date)
+        registrations = registrations.where(ShuttleRegistration.registration_date >= start_date)
     if end_date:
-        query = query.where(ShuttleRegistration.registration_date <= end_date)
-    
-    query = query.order_by(ShuttleRegistration.registration_date, ShuttleSchedule.departure_time)
-    
-    result = await db.execute(query)
-    rows = result.all()
-    
-    # Convert to DataFrame
-    data = []
-    for row in rows:
-        data.append({
-            'Passenger Name': row.passenger_name,
-            'Phone': row.passenger_phone,
-            'Email': row.passenger_email or '',
-            'Date': row.registration_date.isoformat(),
-            'Time': str(row.departure_time),
-            'Route': row.route_type,
-            'Direction': row.direction,
-            'Shuttle': row.shuttle_name,
-            'Company': row.company_name,
-            'Status': row.status
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # Create CSV string
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    csv_content = csv_buffer.getvalue()
-    
-    # Return as streaming response
+        registrations = registrations.where(ShuttleRegistration.registration_date <= end_date)
+    
+    # Standing registrations expanded into one row per trip date in range
+    occurrences = standing_occurrences(start_date, end_date)
+    standing = select(
+        occurrences.c.schedule_id,
+        occurrences.c.passenger_name,
+        occurrences.c.passenger_phone,
+        occurrences.c.passenger_email,
+        occurrences.c.registration_date,
+        literal('standing').label('status'),
+        ShuttleSchedule.departure_time,
+        ShuttleSchedule.route_type,
+        ShuttleSchedule.direction,
+        Shuttle.name.label('shuttle_name'),
+        Company.name.label('company_name')
+    ).select_from(occurrences).join(
+        ShuttleSchedule, occurrences.c.schedule_id == ShuttleSchedule.id
+    ).join(Shuttle).join(Company)
+    
+    # Sent one after the other rather than sorted together: registrations come
+    # in registration_date index order, standing rows as they are generated
+    queries = [registrations, standing]
+    
+    if export_format != 'csv':
+        return _columnar_response(queries, REGISTRATION_EXPORT_SCHEMA, export_format, "registrations_export")
+    
+    async def export_stream():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        
+        # The header goes out before the query runs
+        writer.writerow(REGISTRATION_EXPORT_COLUMNS)
+        yield buffer.getvalue().encode('utf-8')
+        
+        # Own session: rows are fetched from a server-side cursor while the
+        # response is being sent, EXPORT_CHUNK_ROWS at a time
+        async with async_session() as session:
+            async for rows in _stream_partitions(session, queries):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(
+                    (
+                        row.passenger_name,
+                        row.passenger_phone,
+                        row.passenger_email or '',
+                        row.registration_date.isoformat(),
+                        str(row.departure_time),
+                        row.route_type,
+                        row.direction,
+                        row.shuttle_name,
+                        row.company_name,
+                        row.status
+                    )
+                    for row in rows
+                )
+                yield buffer.getvalue().encode('utf-8')
+    
     return StreamingResponse(
-        io.BytesIO(csv_content.encode('utf-8')),
+        export_stream(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=registrations_export.csv"}
     )
 
+@router.get("/export-schedules")
+async def export_schedules(
+    shuttle_id: Optional[UUID] = None,
+    export_format: str = Query('csv', alias="format"),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    _check_export_format(export_format)
+    
+    query = select(
+        ShuttleSchedule.id,
+        ShuttleSchedule.shuttle_id,
+        Shuttle.name.label('shuttle_name'),
+        Company.name.label('company_name'),
+        ShuttleSchedule.route_type,
+        ShuttleSchedule.direction,
+        ShuttleSchedule.departure_time,
+        ShuttleSchedule.arrival_time,
+        ShuttleSchedule.days_of_week,
+        ShuttleSchedule.is_active
+    ).select_from(ShuttleSchedule).outerjoin(Shuttle).outerjoin(Company).order_by(
+        Shuttle.name, ShuttleSchedule.route_type, ShuttleSchedule.direction, ShuttleSchedule.departure_time
+    )
+    if shuttle_id:
+        query = query.where(ShuttleSchedule.shuttle_id == shuttle_id)
+    
+    if export_format != 'csv':
+        return _columnar_response([query], SCHEDULE_EXPORT_SCHEMA, export_format, "schedules_export")
+    
+    async def export_stream():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        
+        # Same columns as the schedule import; re-importing the edited file updates schedules by id
+        writer.writerow(SCHEDULE_EXPORT_SCHEMA.names)
+        yield buffer.getvalue().encode('utf-8')
+        
+        async with async_session() as session:
+            result = await session.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+            async for rows in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(
+                    (
+                        row.id,
+                        row.shuttle_id or '',
+                        row.shuttle_name or '',
+                        row.company_name or '',
+                        row.route_type,
+                        row.direction,
+                        str(row.departure_time),
+                        str(row.arrival_time) if row.arrival_time else '',
+                        f"[{','.join(str(day) for day in row.days_of_week)}]" if row.days_of_week else '',
+                        row.is_active
+                    )
+                    for row in rows
+                )
+                yield buffer.getvalue().encode('utf-8')
+    
+    return StreamingResponse(
+        export_stream(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=schedules_export.csv"}
+    )
+
 @router.post("/import-schedules", response_model=MessageResponse)
 async def import_schedules_csv(
     file: UploadFile = File(...),
@@ -166,57 +284,117 @@ async def import_schedules_csv(
         )
     
     try:
-        # Read CSV file
-        content = await file.read()
-        csv_data = pd.read_csv(io.StringIO(content.decode('utf-8')))
-        
-        # Validate required columns
-        required_columns = ['shuttle_id', 'route_type', 'direction', 'departure_time']
-        missing_columns = [col for col in required_columns if col not in csv_data.columns]
-        
-        if missing_columns:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Missing required columns: {missing_columns}"
-            )
-        
-        imported_count = 0
-        errors = []
-        
-        for index, row in csv_data.iterrows():
-            try:
-                # Create schedule
-                schedule = ShuttleSchedule(
-                    shuttle_id=row['shuttle_id'],
-                    route_type=row['route_type'],
-                    direction=row['direction'],
-                    departure_time=pd.to_datetime(row['departure_time']).time(),
-                    arrival_time=pd.to_datetime(row['arrival_time']).time() if pd.notna(row.get('arrival_time')) else None,
-                    days_of_week=eval(row.get('days_of_week', '[1,2,3,4,5]')),  # Convert string to list
-                    is_active=bool(row.get('is_active', True))
-                )
-                
-                db.add(schedule)
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {index + 1}: {str(e)}")
-        
-        if imported_count > 0:
-            await db.commit()
-        
-        message = f"Successfully imported {imported_count} schedules"
-        if errors:
-            message += f". Errors: {'; '.join(errors[:5])}"  # Show first 5 errors
+        # Read the CSV file chunk by chunk
+        with _upload_text(file) as source:
+            result = await import_schedules(db, source)
         
-        return MessageResponse(message=message)
+        return MessageResponse(message=result.message)
         
+    except CSVImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing CSV: {str(e)}"
         )
 
+async def _validation_report(validated: AsyncIterator[ValidatedChunk], report_format: str) -> AsyncIterator[bytes]:
+    # One piece per validated chunk: the failing rows, then (NDJSON only) a summary line
+    rows = valid_rows = error_rows = 0
+    started = False
+    try:
+        async for chunk in validated:
+            rows += chunk.rows
+            valid_rows += len(chunk.valid)
+            error_rows += len(chunk.errors)
+            
+            buffer = io.StringIO()
+            if report_format == 'csv':
+                writer = csv.writer(buffer, lineterminator='\n')
+                if not started:
+                    writer.writerow(['row', 'error'])
+                writer.writerows(chunk.errors)
+            else:
+                for error in chunk.errors:
+                    buffer.write(json.dumps({"row": error.row, "error": error.message}, ensure_ascii=False) + '\n')
+            started = True
+            yield buffer.getvalue().encode('utf-8')
+    except Exception as e:
+        if not started:
+            raise
+        # The status line is already sent; the failure becomes the last record
+        buffer = io.StringIO()
+        if report_format == 'csv':
+            csv.writer(buffer, lineterminator='\n').writerow(['', str(e)])
+        else:
+            buffer.write(json.dumps({"row": None, "error": str(e)}, ensure_ascii=False) + '\n')
+        yield buffer.getvalue().encode('utf-8')
+        return
+    
+    if report_format == 'ndjson':
+        summary = {"rows": rows, "valid": valid_rows, "errors": error_rows}
+        yield (json.dumps({"summary": summary}) + '\n').encode('utf-8')
+
+async def _stream_validation(file: UploadFile, validate: Callable, report_format: str) -> StreamingResponse:
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a CSV"
+        )
+    if report_format not in VALIDATION_REPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of {list(VALIDATION_REPORT_MEDIA_TYPES)}"
+        )
+    
+    async def report():
+        # Own session: the report is streamed after the handler has returned
+        async with async_session() as db:
+            with _upload_text(file) as source:
+                async for piece in _validation_report(validate(db, source), report_format):
+                    yield piece
+    
+    # The first chunk is validated up front, so file-level errors still get a 400
+    stream = report()
+    try:
+        first_piece = await stream.__anext__()
+    except CSVImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    async def body():
+        yield first_piece
+        async for piece in stream:
+            yield piece
+    
+    return StreamingResponse(
+        body(),
+        media_type=VALIDATION_REPORT_MEDIA_TYPES[report_format],
+        headers={"Content-Disposition": f"attachment; filename=validation_report.{report_format}"}
+    )
+
+# Validate without importing; streams one record per failing row
+@router.post("/validate-registrations")
+async def validate_registrations_csv(
+    file: UploadFile = File(...),
+    report_format: str = Query('ndjson', alias="format"),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    return await _stream_validation(file, validate_registrations, report_format)
+
+@router.post("/validate-schedules")
+async def validate_schedules_csv(
+    file: UploadFile = File(...),
+    report_format: str = Query('ndjson', alias="format"),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    return await _stream_validation(file, validate_schedules, report_format)
+
 # Bulk update schedules
 @router.put("/bulk-update-schedules", response_model=MessageResponse)
 async def bulk_update_schedules(
@@ -258,6 +436,7 @@ async def bulk_update_schedules(
         )
         
         await db.commit()
+        public_cache.invalidate("schedules")
         
         return MessageResponse(
             message=f"Successfully updated {result.rowcount} schedules"
@@ -268,4 +447,182 @@ async def bulk_update_schedules(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error updating schedules: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+def _upload_path(filename: str) -> str:
+    # Only plain names of files in the upload directory; no paths from the client
+    if not filename or os.path.basename(filename) != filename or filename.startswith('.'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file name"
+        )
+    return os.path.join(UPLOAD_DIR, filename)
+
+async def _check_shuttle(db: AsyncSession, shuttle_id: UUID):
+    result = await db.execute(select(Shuttle.id).where(Shuttle.id == shuttle_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shuttle not found"
+        )
+
+async def _save_upload(file: UploadFile) -> str:
+    if not file.filename or not file.filename.endswith('.csv'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a CSV"
+        )
+    
+    # A random prefix keeps uploads of the same file apart
+    stored_name = f"{uuid4().hex}_{os.path.basename(file.filename).replace(' ', '_')}"
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    with open(os.path.join(UPLOAD_DIR, stored_name), 'wb') as stored_file:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            stored_file.write(chunk)
+    
+    return stored_name
+
+async def _queue_job(db: AsyncSession, shuttle_id: UUID, filename: str, import_type: str) -> CSVJobResponse:
+    if import_type not in CSV_IMPORT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"import_type must be one of {list(CSV_IMPORT_TYPES)}"
+        )
+    
+    path = _upload_path(filename)
+    if not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    log = CSVProcessingLog(
+        shuttle_id=shuttle_id, csv_file_name=filename, status="pending", owner=csv_jobs.instance_id
+    )
+    db.add(log)
+    await db.commit()
+    
+    if not csv_jobs.submit(CSVJob(log.id, shuttle_id, path, import_type)):
+        await db.execute(
+            update(CSVProcessingLog)
+            .where(CSVProcessingLog.id == log.id)
+            .values(status="error", error_message="Too many CSV jobs queued")
+        )
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many CSV jobs queued, try again later"
+        )
+    
+    return CSVJobResponse(job_id=log.id, status=log.status, filename=filename)
+
+# Upload a CSV file for later processing
+@router.post("/upload", response_model=CSVUploadResponse)
+async def upload_csv(
+    csvFile: UploadFile = File(...),
+    shuttle_id: UUID = Form(...),
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    await _check_shuttle(db, shuttle_id)
+    filename = await _save_upload(csvFile)
+    
+    return CSVUploadResponse(filename=filename, originalName=csvFile.filename)
+
+# Queue an uploaded file for import; progress is polled from /jobs or /logs
+@router.post("/process", response_model=CSVJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def process_csv(
+    request: CSVProcessRequest,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    await _check_shuttle(db, request.shuttle_id)
+    logger_manager.info("Queueing CSV job", {
+        "shuttle_id": str(request.shuttle_id),
+        "file": request.file_path,
+        "user_id": str(current_user.id)
+    })
+    
+    return await _queue_job(db, request.shuttle_id, request.file_path, request.import_type)
+
+@router.post("/upload-and-process", response_model=CSVJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def upload_and_process_csv(
+    csvFile: UploadFile = File(...),
+    shuttle_id: UUID = Form(...),
+    import_type: str = Form("schedules"),
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    await _check_shuttle(db, shuttle_id)
+    filename = await _save_upload(csvFile)
+    logger_manager.info("Queueing CSV job", {
+        "shuttle_id": str(shuttle_id),
+        "file": filename,
+        "user_id": str(current_user.id)
+    })
+    
+    return await _queue_job(db, shuttle_id, filename, import_type)
+
+@router.get("/jobs/{job_id}", response_model=CSVProcessingLogSchema)
+async def get_csv_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    result = await db.execute(
+        select(CSVProcessingLog).where(CSVProcessingLog.id == job_id)
+    )
+    log = result.scalar_one_or_none()
+    
+    if not log:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CSV job not found"
+        )
+    
+    return log
+
+@router.get("/logs/{shuttle_id}", response_model=List[CSVProcessingLogSchema])
+async def get_csv_logs(
+    shuttle_id: UUID,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    result = await db.execute(
+        select(CSVProcessingLog)
+        .where(CSVProcessingLog.shuttle_id == shuttle_id)
+        .order_by(CSVProcessingLog.created_at.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+@router.delete("/file/{filename}", response_model=MessageResponse)
+async def delete_csv_file(
+    filename: str,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    path = _upload_path(filename)
+    
+    # Files still being imported stay until their job is done
+    result = await db.execute(
+        select(CSVProcessingLog.id).where(
+            CSVProcessingLog.csv_file_name == filename,
+            CSVProcessingLog.status.in_(UNFINISHED_STATUSES)
+        ).limit(1)
+    )
+    if result.scalar_one_or_none() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="File is still being processed"
+        )
+    
+    if not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    os.remove(path)
+    return MessageResponse(message="File deleted successfully")
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import os
+import uuid
+
+from ..events import change_feed
+from ..logging_manager import logger_manager
+
+router = APIRouter()
+
+EVENT_HEARTBEAT_INTERVAL = float(os.getenv("EVENT_HEARTBEAT_INTERVAL", 15))
+
+@router.get("/stream")
+async def stream_changes(request: Request):
+    queue = change_feed.subscribe()
+
+    async def event_stream():
+        try:
+            # Retry hint for EventSource reconnects
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENT_HEARTBEAT_INTERVAL)
+                    yield f"event: change\ndata: {json.dumps(event)}\n\n"
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+        finally:
+            change_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable nginx response buffering so events are flushed immediately
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@router.websocket("/ws")
+async def websocket_changes(websocket: WebSocket):
+    connection_id = str(uuid.uuid4())
+    await websocket.accept()
+    queue = change_feed.subscribe()
+    logger_manager.log_websocket_event("connected", connection_id, {
+        "subscribers": change_feed.subscriber_count
+    })
+
+    async def drain_client():
+        # Clients only listen; reading surfaces disconnects promptly
+        while True:
+            await websocket.receive_text()
+
+    receiver = asyncio.create_task(drain_client())
+    try:
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver},
+                timeout=EVENT_HEARTBEAT_INTERVAL,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                getter.cancel()
+                break
+            if getter in done:
+                await websocket.send_json({"type": "change", **getter.result()})
+            else:
+                getter.cancel()
+                await websocket.send_json({"type": "ping"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        change_feed.unsubscribe(queue)
+        logger_manager.log_websocket_event("disconnected", connection_id, {
+            "subscribers": change_feed.subscriber_count
+        })
@@ -1,30 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from typing import List
+from sqlalchemy import select, update, delete, text, tuple_, and_, or_
+from typing import List, Optional
 from uuid import UUID
-from datetime import date, datetime
+from datetime import date, datetime, time
 from sqlalchemy import cast, Date, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+import base64
+import json
+import os
 
 from ..database import get_database_session
-from ..models import ShuttleRegistration, ShuttleSchedule
+from ..cache import public_cache, render_json, conditional_response
+from ..seats import reserve_seats, reserve_available_seats, release_seats, trip_date_of, get_trip_occupancy
+from ..holds import seat_holds, SEAT_HOLD_TTL
+from ..waitlist import promote_waitlisted, WAITLISTED
+from ..standing import standing_public_query
+from ..models import ShuttleRegistration, ShuttleSchedule, StandingRegistration, REGISTRATION_TRIP_KEY, normalize_phone
 from ..logging_manager import logger_manager
-from ..schemas import ShuttleRegistration as RegistrationSchema, RegistrationCreate, RegistrationUpdate, MessageResponse
+from ..schemas import (
+    ShuttleRegistration as RegistrationSchema, RegistrationCreate, RegistrationUpdate, RegistrationPage, MessageResponse,
+    SeatHoldCreate, SeatHoldConfirm, SeatHoldResponse, TripAvailability,
+    BulkRegistrationCreate, BulkRegistrationResponse, BulkRegistrationResult
+)
 from ..auth import get_current_active_user, AdminUser
 
 router = APIRouter()
 
-@router.get("/count/public")
-async def get_registration_count_public(
+BULK_REGISTRATION_MAX = int(os.getenv("BULK_REGISTRATION_MAX", 500))
+
+def _apply_public_filters(
+    query,
     time_slot: str = None,
     route_type: str = None,
     direction: str = None,
-    registration_date: str = None,
-    db: AsyncSession = Depends(get_database_session)
+    registration_date: str = None
 ):
-    # Build query based on provided parameters
-    query = select(ShuttleRegistration)
-    
     if time_slot:
         # Convert time_slot to match database format (assumes time_slot is like "07:00")
         query = query.where(ShuttleRegistration.time_slot == time_slot + ":00")
@@ -40,56 +52,248 @@ async def get_registration_count_public(
         date_obj = datetime.strptime(registration_date, '%Y-%m-%d').date()
         query = query.where(func.date(ShuttleRegistration.registration_date) == date_obj)
     
-    result = await db.execute(query)
-    registrations = result.scalars().all()
-    
-    return {"count": len(registrations)}
+    # Waitlisted passengers do not hold a seat
+    return query.where(ShuttleRegistration.status != WAITLISTED)
 
-@router.get("/public", response_model=List[RegistrationSchema])
-async def get_registrations_public(
+def _parse_time_slot(time_slot: str = None):
+    if not time_slot:
+        return None
+    try:
+        return time.fromisoformat(time_slot)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid time_slot, expected HH:MM"
+        )
+
+@router.get("/count/public")
+async def get_registration_count_public(
+    request: Request,
     time_slot: str = None,
     route_type: str = None,
     direction: str = None,
     registration_date: str = None,
     db: AsyncSession = Depends(get_database_session)
 ):
-    # Build query based on provided parameters
-    query = select(ShuttleRegistration)
+    slot_time = _parse_time_slot(time_slot)
+    query = _apply_public_filters(
+        select(func.count(ShuttleRegistration.id)),
+        time_slot, route_type, direction, registration_date
+    )
     
-    if time_slot:
-        # Convert time_slot to match database format (assumes time_slot is like "07:00")
-        query = query.where(ShuttleRegistration.time_slot == time_slot + ":00")
+    result = await db.execute(query)
+    count = result.scalar()
     
-    if route_type:
-        query = query.where(ShuttleRegistration.route_type == route_type)
+    if registration_date:
+        # Standing riders of that date count as booked too
+        standing = await db.execute(standing_public_query(
+            [func.count(StandingRegistration.id)],
+            datetime.strptime(registration_date, '%Y-%m-%d').date(),
+            slot_time, route_type, direction
+        ))
+        count += standing.scalar()
     
-    if direction:
-        query = query.where(ShuttleRegistration.direction == direction)
+    # Counts move with every booking, so clients always revalidate
+    return conditional_response(request, render_json({"count": count}), max_age=0, stale_while_revalidate=5)
+
+@router.get("/count/public/slots")
+async def get_registration_slot_counts_public(
+    request: Request,
+    registration_date: str = None,
+    db: AsyncSession = Depends(get_database_session)
+):
+    # Counts for every (route_type, direction, time_slot) in one grouped query
+    query = _apply_public_filters(
+        select(
+            ShuttleRegistration.route_type,
+            ShuttleRegistration.direction,
+            ShuttleRegistration.time_slot,
+            func.count(ShuttleRegistration.id).label('count')
+        ),
+        registration_date=registration_date
+    ).group_by(
+        ShuttleRegistration.route_type,
+        ShuttleRegistration.direction,
+        ShuttleRegistration.time_slot
+    )
+    
+    result = await db.execute(query)
+    
+    slot_counts = {}
+    for row in result.all():
+        # Same "07:00" format accepted by /count/public
+        slot = (row.route_type, row.direction, row.time_slot[:5] if row.time_slot else row.time_slot)
+        slot_counts[slot] = slot_counts.get(slot, 0) + row.count
     
     if registration_date:
-        # Convert string date to date object
-        date_obj = datetime.strptime(registration_date, '%Y-%m-%d').date()
-        query = query.where(func.date(ShuttleRegistration.registration_date) == date_obj)
+        standing = await db.execute(
+            standing_public_query(
+                [
+                    ShuttleSchedule.route_type,
+                    ShuttleSchedule.direction,
+                    ShuttleSchedule.departure_time,
+                    func.count(StandingRegistration.id).label('count')
+                ],
+                datetime.strptime(registration_date, '%Y-%m-%d').date()
+            ).group_by(
+                ShuttleSchedule.route_type,
+                ShuttleSchedule.direction,
+                ShuttleSchedule.departure_time
+            )
+        )
+        for row in standing.all():
+            slot = (row.route_type, row.direction, row.departure_time.strftime("%H:%M"))
+            slot_counts[slot] = slot_counts.get(slot, 0) + row.count
+    
+    slot_counts = [
+        {"route_type": route_type, "direction": direction, "time_slot": time_slot, "count": count}
+        for (route_type, direction, time_slot), count in slot_counts.items()
+    ]
+    
+    return conditional_response(request, render_json(slot_counts), max_age=0, stale_while_revalidate=5)
+
+@router.get("/public", response_model=List[RegistrationSchema])
+async def get_registrations_public(
+    request: Request,
+    time_slot: str = None,
+    route_type: str = None,
+    direction: str = None,
+    registration_date: str = None,
+    db: AsyncSession = Depends(get_database_session)
+):
+    query = _apply_public_filters(
+        select(ShuttleRegistration),
+        time_slot, route_type, direction, registration_date
+    )
     
     result = await db.execute(query.order_by(ShuttleRegistration.registration_time.desc()))
-    registrations = result.scalars().all()
+    registrations = [RegistrationSchema.model_validate(registration) for registration in result.scalars().all()]
     
-    return registrations
+    # Names and phone numbers: never stored by shared caches, revalidated by ETag
+    return conditional_response(request, render_json(registrations), private=True)
 
-@router.get("/", response_model=List[RegistrationSchema])
+def _trip_key_filter(schedule_id: UUID, registration_date: date, passenger_phone: str) -> list:
+    return [
+        ShuttleRegistration.schedule_id == schedule_id,
+        cast(ShuttleRegistration.registration_date, Date) == registration_date,
+        ShuttleRegistration.passenger_phone_normalized == normalize_phone(passenger_phone)
+    ]
+
+def _encode_page_cursor(registration: ShuttleRegistration) -> str:
+    # registration_time is nullable; such rows are encoded with "t": null
+    registration_time = registration.registration_time
+    payload = json.dumps({
+        "t": registration_time.isoformat() if registration_time else None,
+        "id": str(registration.id)
+    })
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def _decode_page_cursor(cursor: str):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cursor_time = datetime.fromisoformat(payload["t"]) if payload["t"] is not None else None
+        if cursor_time is not None and cursor_time.tzinfo is None:
+            raise ValueError("naive cursor timestamp")
+        return cursor_time, UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid page cursor"
+        )
+
+@router.get("/", response_model=RegistrationPage)
 async def get_registrations(
+    registration_date: Optional[date] = Query(None, alias="date"),
+    schedule_id: Optional[UUID] = None,
+    route_type: Optional[str] = None,
+    registration_status: Optional[str] = Query(None, alias="status"),
+    phone: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    include_total: bool = False,
     db: AsyncSession = Depends(get_database_session),
     current_user: AdminUser = Depends(get_current_active_user)
 ):
     logger_manager.info("Fetching registrations list", {"user_id": str(current_user.id)})
     
+    filters = []
+    if registration_date:
+        filters.append(cast(ShuttleRegistration.registration_date, Date) == registration_date)
+    if schedule_id:
+        filters.append(ShuttleRegistration.schedule_id == schedule_id)
+    if route_type:
+        filters.append(ShuttleRegistration.schedule_id.in_(
+            select(ShuttleSchedule.id).where(ShuttleSchedule.route_type == route_type)
+        ))
+    if registration_status:
+        filters.append(ShuttleRegistration.status == registration_status)
+    if phone:
+        # Any spelling of the number ("050-1234567", "0501234567") finds the passenger
+        filters.append(ShuttleRegistration.passenger_phone_normalized == normalize_phone(phone))
+    
+    # Keyset pagination on (registration_time, id), newest first; rows without
+    # a registration_time sort first, as Postgres does for DESC
+    query = select(ShuttleRegistration).where(*filters)
+    if cursor:
+        cursor_time, cursor_id = _decode_page_cursor(cursor)
+        if cursor_time is None:
+            query = query.where(or_(
+                and_(ShuttleRegistration.registration_time.is_(None), ShuttleRegistration.id < cursor_id),
+                ShuttleRegistration.registration_time.is_not(None)
+            ))
+        else:
+            query = query.where(
+                tuple_(ShuttleRegistration.registration_time, ShuttleRegistration.id) < tuple_(cursor_time, cursor_id)
+            )
+    
     result = await db.execute(
-        select(ShuttleRegistration).order_by(ShuttleRegistration.registration_time.desc())
+        query.order_by(ShuttleRegistration.registration_time.desc().nulls_first(), ShuttleRegistration.id.desc())
+        .limit(limit + 1)
     )
     registrations = result.scalars().all()
     
+    next_cursor = None
+    if len(registrations) > limit:
+        registrations = registrations[:limit]
+        next_cursor = _encode_page_cursor(registrations[-1])
+    
+    total_estimate = None
+    if include_total:
+        if filters:
+            # Filtered sets are narrowed by the date/schedule/phone indexes
+            total_result = await db.execute(select(func.count(ShuttleRegistration.id)).where(*filters))
+        else:
+            # Planner statistics instead of a full table scan
+            total_result = await db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'shuttle_registrations'::regclass")
+            )
+        total_estimate = max(total_result.scalar() or 0, 0)
+    
     logger_manager.info("Registrations retrieved", {"count": len(registrations)})
-    return registrations
+    return RegistrationPage(
+        items=registrations,
+        next_cursor=next_cursor,
+        total_estimate=total_estimate
+    )
+
+@router.get("/waitlist", response_model=List[RegistrationSchema])
+async def get_trip_waitlist(
+    schedule_id: UUID,
+    registration_date: date,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    # In promotion order: the first entry gets the next free seat
+    result = await db.execute(
+        select(ShuttleRegistration)
+        .where(
+            ShuttleRegistration.schedule_id == schedule_id,
+            cast(ShuttleRegistration.registration_date, Date) == registration_date,
+            ShuttleRegistration.status == WAITLISTED
+        )
+        .order_by(ShuttleRegistration.registration_time, ShuttleRegistration.id)
+    )
+    return result.scalars().all()
 
 @router.get("/{registration_id}", response_model=RegistrationSchema)
 async def get_registration(
@@ -132,20 +336,350 @@ async def create_registration_impl(
             detail="Schedule not found"
         )
     
-    new_registration = ShuttleRegistration(
-        schedule_id=registration_data.schedule_id,
-        passenger_name=registration_data.passenger_name,
-        passenger_phone=registration_data.passenger_phone,
-        passenger_email=registration_data.passenger_email,
-        registration_date=registration_data.registration_date,
-        status=registration_data.status
+    # One registration per passenger and trip: repeats return the existing one
+    trip_key = _trip_key_filter(
+        registration_data.schedule_id, registration_data.registration_date, registration_data.passenger_phone
     )
+    result = await db.execute(select(ShuttleRegistration).where(*trip_key).with_for_update())
+    existing = result.scalar_one_or_none()
+    
+    if existing and (existing.status != 'cancelled' or registration_data.status == 'cancelled'):
+        await db.commit()
+        return existing
+    
+    registration_status = registration_data.status
+    if registration_status == 'confirmed':
+        trip = (registration_data.schedule_id, registration_data.registration_date)
+        if not await reserve_seats(db, *trip, held=seat_holds.held(trip)):
+            if not registration_data.waitlist_if_full:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="This trip is full"
+                )
+            registration_status = WAITLISTED
+    
+    registration_values = {
+        "passenger_name": registration_data.passenger_name,
+        "passenger_phone": registration_data.passenger_phone,
+        "passenger_email": registration_data.passenger_email,
+        "status": registration_status
+    }
     
-    db.add(new_registration)
+    if existing:
+        # Registering again after a cancellation reactivates the same row
+        await db.execute(
+            update(ShuttleRegistration)
+            .where(ShuttleRegistration.id == existing.id)
+            .values(**registration_values)
+        )
+        registration_id = existing.id
+    else:
+        result = await db.execute(
+            pg_insert(ShuttleRegistration)
+            .values(
+                schedule_id=registration_data.schedule_id,
+                registration_date=registration_data.registration_date,
+                **registration_values
+            )
+            .on_conflict_do_nothing(index_elements=REGISTRATION_TRIP_KEY)
+            .returning(ShuttleRegistration.id)
+        )
+        registration_id = result.scalar_one_or_none()
+    
+    if registration_id is None:
+        # A concurrent request registered the same passenger first; the
+        # rollback also gives back the seat reserved above
+        await db.rollback()
+        result = await db.execute(select(ShuttleRegistration).where(*trip_key))
+        return result.scalar_one()
+    
+    await db.commit()
+    public_cache.invalidate("registrations")
+    
+    result = await db.execute(
+        select(ShuttleRegistration)
+        .where(ShuttleRegistration.id == registration_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+@router.get("/availability/public", response_model=TripAvailability)
+async def get_trip_availability_public(
+    schedule_id: UUID,
+    registration_date: date,
+    db: AsyncSession = Depends(get_database_session)
+):
+    occupancy = await get_trip_occupancy(db, schedule_id, registration_date)
+    if occupancy is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Schedule not found"
+        )
+    
+    capacity, booked = occupancy
+    held = seat_holds.held((schedule_id, registration_date))
+    return TripAvailability(
+        schedule_id=schedule_id,
+        registration_date=registration_date,
+        capacity=capacity,
+        booked=booked,
+        held=held,
+        available=max(capacity - booked - held, 0)
+    )
+
+@router.post("/holds", response_model=SeatHoldResponse)
+async def create_seat_hold(
+    hold_data: SeatHoldCreate,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    # Reads the trip's occupancy; the hold itself lives only in memory
+    occupancy = await get_trip_occupancy(db, hold_data.schedule_id, hold_data.registration_date)
+    if occupancy is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Schedule not found"
+        )
+    
+    capacity, booked = occupancy
+    trip = (hold_data.schedule_id, hold_data.registration_date)
+    if booked + seat_holds.held(trip) >= capacity:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This trip is full"
+        )
+    
+    hold = seat_holds.create(trip, hold_data.ttl_seconds or SEAT_HOLD_TTL)
+    return SeatHoldResponse(
+        hold_id=hold.hold_id,
+        schedule_id=hold_data.schedule_id,
+        registration_date=hold_data.registration_date,
+        expires_in=seat_holds.seconds_left(hold),
+        available=max(capacity - booked - seat_holds.held(trip), 0)
+    )
+
+@router.post("/holds/{hold_id}/confirm", response_model=RegistrationSchema)
+async def confirm_seat_hold(
+    hold_id: str,
+    passenger: SeatHoldConfirm,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    # Take the hold out first so its own seat is not counted against it
+    hold = seat_holds.release(hold_id)
+    if hold is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Seat hold expired or not found"
+        )
+    
+    schedule_id, trip_date = hold.trip
+    try:
+        return await create_registration_impl(
+            RegistrationCreate(
+                schedule_id=schedule_id,
+                registration_date=trip_date,
+                **passenger.dict()
+            ),
+            db,
+            current_user
+        )
+    except HTTPException:
+        seat_holds.restore(hold)
+        raise
+
+@router.delete("/holds/{hold_id}", response_model=MessageResponse)
+async def release_seat_hold(
+    hold_id: str,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    hold = seat_holds.release(hold_id)
+    if hold is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Seat hold not found"
+        )
+    
+    # The seat is free again: the head of the waitlist gets it first
+    promoted = await promote_waitlisted(db, *hold.trip)
+    await db.commit()
+    if promoted:
+        public_cache.invalidate("registrations")
+    
+    return MessageResponse(message="Seat hold released")
+
+@router.post("/bulk", response_model=BulkRegistrationResponse)
+async def create_registrations_bulk(
+    bulk_data: BulkRegistrationCreate,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    items = bulk_data.registrations
+    if len(items) > BULK_REGISTRATION_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_REGISTRATION_MAX} registrations per request"
+        )
+    
+    logger_manager.info("Creating registrations in bulk", {
+        "count": len(items),
+        "user_id": str(current_user.id)
+    })
+    
+    results = [BulkRegistrationResult(index=index, success=True) for index in range(len(items))]
+    
+    # Verify all referenced schedules with one IN query
+    schedule_ids = {item.schedule_id for item in items}
+    result = await db.execute(
+        select(ShuttleSchedule.id).where(ShuttleSchedule.id.in_(schedule_ids))
+    )
+    existing_schedule_ids = set(result.scalars().all())
+    
+    # One registration per passenger and trip: index -> trip key of every item still accepted
+    trip_keys = {}
+    seen_trip_keys = set()
+    for index, item in enumerate(items):
+        if item.schedule_id not in existing_schedule_ids:
+            results[index] = BulkRegistrationResult(index=index, success=False, error="Schedule not found")
+            continue
+        trip_key = (item.schedule_id, item.registration_date, normalize_phone(item.passenger_phone))
+        if trip_key in seen_trip_keys:
+            results[index] = BulkRegistrationResult(
+                index=index, success=False, error="Passenger is already registered for this trip"
+            )
+            continue
+        seen_trip_keys.add(trip_key)
+        trip_keys[index] = trip_key
+    
+    # The passengers' existing registrations, locked like in create_registration_impl
+    existing = {}
+    if trip_keys:
+        result = await db.execute(
+            select(ShuttleRegistration)
+            .where(tuple_(
+                ShuttleRegistration.schedule_id,
+                cast(ShuttleRegistration.registration_date, Date),
+                ShuttleRegistration.passenger_phone_normalized
+            ).in_(list(trip_keys.values())))
+            .with_for_update()
+        )
+        existing = {
+            (registration.schedule_id, trip_date_of(registration.registration_date), registration.passenger_phone_normalized): registration
+            for registration in result.scalars().all()
+        }
+    
+    # Same rules as a single registration: an active registration stays as it
+    # is, a cancelled one is reactivated with the new values
+    reactivated = {}
+    for index, trip_key in list(trip_keys.items()):
+        registration = existing.get(trip_key)
+        if registration is None:
+            continue
+        if registration.status != 'cancelled' or items[index].status == 'cancelled':
+            results[index] = BulkRegistrationResult(
+                index=index, success=False, error="Passenger is already registered for this trip"
+            )
+            del trip_keys[index]
+        else:
+            reactivated[index] = registration.id
+    
+    # Seats are allocated passenger by passenger, in request order; sorted by
+    # trip, so concurrent bulk requests lock the trip_seats rows in the same order
+    trips = {}
+    for index in trip_keys:
+        if items[index].status == 'confirmed':
+            trips.setdefault((items[index].schedule_id, items[index].registration_date), []).append(index)
+    
+    waitlisted = set()
+    for trip in sorted(trips):
+        indexes = trips[trip]
+        seats = await reserve_available_seats(db, *trip, seats=len(indexes), held=seat_holds.held(trip))
+        for index in indexes[seats:]:
+            if items[index].waitlist_if_full:
+                waitlisted.add(index)
+                continue
+            results[index] = BulkRegistrationResult(index=index, success=False, error="This trip is full")
+            del trip_keys[index]
+    
+    def registration_values(index: int) -> dict:
+        item = items[index]
+        return {
+            "passenger_name": item.passenger_name,
+            "passenger_phone": item.passenger_phone,
+            "passenger_email": item.passenger_email,
+            "status": WAITLISTED if index in waitlisted else item.status
+        }
+    
+    reactivated = {index: registration_id for index, registration_id in reactivated.items() if index in trip_keys}
+    if reactivated:
+        # ORM bulk UPDATE by primary key, one executemany
+        await db.execute(
+            update(ShuttleRegistration),
+            [
+                {"id": registration_id, **registration_values(index)}
+                for index, registration_id in reactivated.items()
+            ]
+        )
+        for index, registration_id in reactivated.items():
+            results[index].registration_id = registration_id
+    
+    new_indexes = [index for index in trip_keys if index not in reactivated]
+    if new_indexes:
+        # Single multi-row INSERT ... RETURNING; passengers registered
+        # concurrently since the lookup above are skipped
+        result = await db.execute(
+            pg_insert(ShuttleRegistration)
+            .on_conflict_do_nothing(index_elements=REGISTRATION_TRIP_KEY)
+            .returning(
+                ShuttleRegistration.id,
+                ShuttleRegistration.schedule_id,
+                ShuttleRegistration.registration_date,
+                ShuttleRegistration.passenger_phone_normalized
+            ),
+            [
+                {
+                    "schedule_id": items[index].schedule_id,
+                    "registration_date": items[index].registration_date,
+                    **registration_values(index)
+                }
+                for index in new_indexes
+            ]
+        )
+        inserted = {
+            (row.schedule_id, trip_date_of(row.registration_date), row.passenger_phone_normalized): row.id
+            for row in result.all()
+        }
+        
+        duplicate_seats = {}
+        for index in new_indexes:
+            registration_id = inserted.get(trip_keys[index])
+            if registration_id is not None:
+                results[index].registration_id = registration_id
+                continue
+            
+            results[index] = BulkRegistrationResult(
+                index=index, success=False, error="Passenger is already registered for this trip"
+            )
+            if items[index].status == 'confirmed' and index not in waitlisted:
+                trip = (items[index].schedule_id, items[index].registration_date)
+                duplicate_seats[trip] = duplicate_seats.get(trip, 0) + 1
+        
+        # Give back the seats reserved for skipped duplicates
+        for trip, seats in duplicate_seats.items():
+            await release_seats(db, *trip, seats=seats)
+    
+    accepted = [index for index, item_result in enumerate(results) if item_result.success]
     await db.commit()
-    await db.refresh(new_registration)
+    if accepted:
+        public_cache.invalidate("registrations")
     
-    return new_registration
+    return BulkRegistrationResponse(
+        created=len(accepted),
+        failed=len(items) - len(accepted),
+        results=results
+    )
 
 # Route handlers for both with and without trailing slash
 @router.post("/", response_model=RegistrationSchema)
@@ -173,7 +707,9 @@ async def update_registration(
 ):
     # Check if registration exists
     result = await db.execute(
-        select(ShuttleRegistration).where(ShuttleRegistration.id == registration_id)
+        select(ShuttleRegistration)
+        .where(ShuttleRegistration.id == registration_id)
+        .with_for_update()
     )
     registration = result.scalar_one_or_none()
     
@@ -186,13 +722,42 @@ async def update_registration(
     # Update only provided fields
     update_data = registration_data.dict(exclude_unset=True)
     if update_data:
-        await db.execute(
-            update(ShuttleRegistration)
-            .where(ShuttleRegistration.id == registration_id)
-            .values(**update_data)
-        )
+        # Move the seat when the booking is confirmed, cancelled or re-dated
+        old_date = trip_date_of(registration.registration_date)
+        new_date = update_data.get('registration_date', old_date)
+        was_confirmed = registration.status == 'confirmed'
+        is_confirmed = update_data.get('status', registration.status) == 'confirmed'
+        
+        if was_confirmed and (not is_confirmed or new_date != old_date):
+            await release_seats(db, registration.schedule_id, old_date)
+        if is_confirmed and (not was_confirmed or new_date != old_date):
+            trip = (registration.schedule_id, new_date)
+            if not await reserve_seats(db, *trip, held=seat_holds.held(trip)):
+                await db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="This trip is full"
+                )
+        
+        try:
+            await db.execute(
+                update(ShuttleRegistration)
+                .where(ShuttleRegistration.id == registration_id)
+                .values(**update_data)
+            )
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Passenger is already registered for this trip"
+            )
+        
+        # The freed seat goes to the head of the waitlist in the same transaction
+        if was_confirmed and (not is_confirmed or new_date != old_date):
+            await promote_waitlisted(db, registration.schedule_id, old_date)
         await db.commit()
         await db.refresh(registration)
+        public_cache.invalidate("registrations")
     
     return registration
 
@@ -204,7 +769,9 @@ async def delete_registration(
 ):
     # Check if registration exists
     result = await db.execute(
-        select(ShuttleRegistration).where(ShuttleRegistration.id == registration_id)
+        select(ShuttleRegistration)
+        .where(ShuttleRegistration.id == registration_id)
+        .with_for_update()
     )
     registration = result.scalar_one_or_none()
     
@@ -218,7 +785,13 @@ async def delete_registration(
     await db.execute(
         delete(ShuttleRegistration).where(ShuttleRegistration.id == registration_id)
     )
+    
+    if registration.status == 'confirmed':
+        trip_date = trip_date_of(registration.registration_date)
+        await release_seats(db, registration.schedule_id, trip_date)
+        await promote_waitlisted(db, registration.schedule_id, trip_date)
     await db.commit()
+    public_cache.invalidate("registrations")
     
     return MessageResponse(message="Registration deleted successfully")
 
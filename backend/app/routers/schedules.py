@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, func, cast, Date
 from typing import List
 from uuid import UUID
+from datetime import datetime
 
 from ..database import get_database_session
-from ..models import ShuttleSchedule, Shuttle, Company
+from ..cache import public_cache, make_cache_key, render_json, conditional_response
+from ..models import ShuttleSchedule, Shuttle, Company, ShuttleRegistration
 from ..logging_manager import logger_manager
+from ..standing import standing_counts_on
 from ..schemas import ShuttleSchedule as ScheduleSchema, ScheduleCreate, ScheduleUpdate, MessageResponse, OrganizedSchedules, ScheduleEntry, RouteSchedules
 from ..auth import get_current_active_user, AdminUser
 
@@ -14,13 +17,21 @@ router = APIRouter()
 
 @router.get("/public", response_model=List[ScheduleSchema])
 async def get_schedules_public(
+    request: Request,
     db: AsyncSession = Depends(get_database_session)
 ):
-    result = await db.execute(
-        select(ShuttleSchedule).order_by(ShuttleSchedule.departure_time)
-    )
-    schedules = result.scalars().all()
-    return schedules
+    cache_key = make_cache_key("schedules.public")
+    rendered = public_cache.get(cache_key)
+    if rendered is None:
+        result = await db.execute(
+            select(ShuttleSchedule).order_by(ShuttleSchedule.departure_time)
+        )
+        schedules = [ScheduleSchema.model_validate(schedule) for schedule in result.scalars().all()]
+        
+        rendered = render_json(schedules)
+        public_cache.set(cache_key, rendered, tags=("schedules",))
+    
+    return conditional_response(request, rendered)
 
 @router.get("/", response_model=List[ScheduleSchema])
 async def get_schedules(
@@ -92,6 +103,7 @@ async def create_schedule(
     db.add(new_schedule)
     await db.commit()
     await db.refresh(new_schedule)
+    public_cache.invalidate("schedules")
     
     return new_schedule
 
@@ -124,6 +136,7 @@ async def update_schedule(
         )
         await db.commit()
         await db.refresh(schedule)
+        public_cache.invalidate("schedules")
     
     return schedule
 
@@ -150,6 +163,7 @@ async def delete_schedule(
         delete(ShuttleSchedule).where(ShuttleSchedule.id == schedule_id)
     )
     await db.commit()
+    public_cache.invalidate("schedules")
     
     return MessageResponse(message="Schedule deleted successfully")
 
@@ -169,10 +183,20 @@ async def get_schedules_by_shuttle(
 
 @router.get("/organized/display/public", response_model=OrganizedSchedules)
 async def get_organized_schedules_public(
+    request: Request,
     date: str = None,
     db: AsyncSession = Depends(get_database_session)
 ):
-    return await _get_organized_schedules(db)
+    cache_key = make_cache_key("schedules.organized.public", date=date)
+    rendered = public_cache.get(cache_key)
+    if rendered is None:
+        organized = await _get_organized_schedules(db, date)
+        
+        # registeredCount makes this depend on registrations as well
+        rendered = render_json(organized)
+        public_cache.set(cache_key, rendered, tags=("schedules", "shuttles", "companies", "registrations"))
+    
+    return conditional_response(request, rendered)
 
 @router.get("/organized/display", response_model=OrganizedSchedules)
 async def get_organized_schedules(
@@ -180,18 +204,63 @@ async def get_organized_schedules(
     db: AsyncSession = Depends(get_database_session),
     current_user: AdminUser = Depends(get_current_active_user)
 ):
-    return await _get_organized_schedules(db)
+    return await _get_organized_schedules(db, date)
+
+def _parse_display_date(date: str = None):
+    if not date:
+        return None
+    try:
+        return datetime.strptime(date, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format, expected YYYY-MM-DD"
+        )
 
-async def _get_organized_schedules(db: AsyncSession) -> OrganizedSchedules:
+async def _get_organized_schedules(db: AsyncSession, date: str = None) -> OrganizedSchedules:
+    date_obj = _parse_display_date(date)
+    
+    # Confirmed registrations per schedule for the requested day (today by default)
+    registration_counts = (
+        select(
+            ShuttleRegistration.schedule_id,
+            func.count(ShuttleRegistration.id).label('registered_count')
+        )
+        .where(
+            ShuttleRegistration.status == 'confirmed',
+            cast(ShuttleRegistration.registration_date, Date) == (date_obj or func.current_date())
+        )
+        .group_by(ShuttleRegistration.schedule_id)
+        .subquery()
+    )
+    standing_counts = standing_counts_on(date_obj or func.current_date())
+    
     # Get all schedules with shuttle and company info
-    result = await db.execute(
-        select(ShuttleSchedule, Shuttle.name.label('shuttle_name'), Shuttle.capacity, Company.name.label('company_name'))
+    query = (
+        select(
+            ShuttleSchedule,
+            Shuttle.name.label('shuttle_name'),
+            Shuttle.capacity,
+            Company.name.label('company_name'),
+            (
+                func.coalesce(registration_counts.c.registered_count, 0)
+                + func.coalesce(standing_counts.c.standing_count, 0)
+            ).label('registered_count')
+        )
         .join(Shuttle, ShuttleSchedule.shuttle_id == Shuttle.id)
         .join(Company, Shuttle.company_id == Company.id)
+        .outerjoin(registration_counts, registration_counts.c.schedule_id == ShuttleSchedule.id)
+        .outerjoin(standing_counts, standing_counts.c.schedule_id == ShuttleSchedule.id)
         .where(ShuttleSchedule.is_active == True)
         .order_by(ShuttleSchedule.departure_time)
     )
     
+    if date_obj:
+        # Only trips running on that weekday (1=Monday, 7=Sunday), served by the GIN index
+        query = query.where(ShuttleSchedule.days_of_week.contains([date_obj.isoweekday()]))
+    
+    result = await db.execute(query)
+    
     schedules_data = result.all()
     
     # Organize schedules by route and direction
@@ -200,7 +269,7 @@ async def _get_organized_schedules(db: AsyncSession) -> OrganizedSchedules:
         "kiryat_aryeh_to_tzafrir": {"outbound": [], "return": []}
     }
     
-    for schedule, shuttle_name, capacity, company_name in schedules_data:
+    for schedule, shuttle_name, capacity, company_name, registered_count in schedules_data:
         # Format time
         departure_time = schedule.departure_time
         time_str = departure_time.strftime("%H:%M")
@@ -217,7 +286,7 @@ async def _get_organized_schedules(db: AsyncSession) -> OrganizedSchedules:
             shuttleName=shuttle_name,
             capacity=capacity,
             companyName=company_name,
-            registeredCount=0  # TODO: Calculate actual registration count
+            registeredCount=registered_count
         )
         
         # Add to appropriate route and direction
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 from sqlalchemy.orm import selectinload, joinedload
@@ -6,6 +6,7 @@ from typing import List
 from uuid import UUID
 
 from ..database import get_database_session
+from ..cache import public_cache, make_cache_key, render_json, conditional_response
 from ..models import Shuttle, Company
 from ..logging_manager import logger_manager
 from ..schemas import Shuttle as ShuttleSchema, ShuttleCreate, ShuttleUpdate, MessageResponse
@@ -15,29 +16,36 @@ router = APIRouter()
 
 @router.get("/public", response_model=List[ShuttleSchema])
 async def get_shuttles_public(
+    request: Request,
     db: AsyncSession = Depends(get_database_session)
-):    
-    result = await db.execute(
-        select(Shuttle, Company.name.label('company_name'))
-        .join(Company)
-        .order_by(Shuttle.name)
-    )
-    
-    shuttles = []
-    for shuttle, company_name in result.all():
-        shuttle_dict = {
-            "id": shuttle.id,
-            "name": shuttle.name,
-            "company_id": shuttle.company_id,
-            "capacity": shuttle.capacity,
-            "status": shuttle.status,
-            "created_at": shuttle.created_at,
-            "updated_at": shuttle.updated_at,
-            "company_name": company_name
-        }
-        shuttles.append(ShuttleSchema(**shuttle_dict))
-    
-    return shuttles
+):
+    cache_key = make_cache_key("shuttles.public")
+    rendered = public_cache.get(cache_key)
+    if rendered is None:
+        result = await db.execute(
+            select(Shuttle, Company.name.label('company_name'))
+            .join(Company)
+            .order_by(Shuttle.name)
+        )
+        
+        shuttles = []
+        for shuttle, company_name in result.all():
+            shuttle_dict = {
+                "id": shuttle.id,
+                "name": shuttle.name,
+                "company_id": shuttle.company_id,
+                "capacity": shuttle.capacity,
+                "status": shuttle.status,
+                "created_at": shuttle.created_at,
+                "updated_at": shuttle.updated_at,
+                "company_name": company_name
+            }
+            shuttles.append(ShuttleSchema(**shuttle_dict))
+        
+        rendered = render_json(shuttles)
+        public_cache.set(cache_key, rendered, tags=("shuttles", "companies"))
+    
+    return conditional_response(request, rendered)
 
 @router.get("/", response_model=List[ShuttleSchema])
 async def get_shuttles(
@@ -130,6 +138,7 @@ async def create_shuttle(
     db.add(new_shuttle)
     await db.commit()
     await db.refresh(new_shuttle)
+    public_cache.invalidate("shuttles")
     
     # Return with company name
     shuttle_dict = {
@@ -174,6 +183,7 @@ async def update_shuttle(
         )
         await db.commit()
         await db.refresh(shuttle)
+        public_cache.invalidate("shuttles")
     
     # Get company name for response
     company_result = await db.execute(
@@ -217,5 +227,7 @@ async def delete_shuttle(
         delete(Shuttle).where(Shuttle.id == shuttle_id)
     )
     await db.commit()
+    # Schedules are removed by ON DELETE CASCADE
+    public_cache.invalidate("shuttles", "schedules")
     
     return MessageResponse(message="Shuttle deleted successfully")
\ No newline at end of file
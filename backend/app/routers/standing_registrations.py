@@ -0,0 +1,204 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete
+from typing import List, Optional
+from uuid import UUID
+from datetime import date
+
+from ..database import get_database_session
+from ..cache import public_cache
+from ..seats import reset_trip_seats, reseat_standing
+from ..waitlist import promote_schedule_waitlist
+from ..standing import standing_occurrences
+from ..models import StandingRegistration, ShuttleSchedule
+from ..logging_manager import logger_manager
+from ..schemas import (
+    StandingRegistration as StandingRegistrationSchema, StandingRegistrationCreate, StandingRegistrationUpdate,
+    StandingOccurrence, MessageResponse
+)
+from ..auth import get_current_active_user, AdminUser
+
+router = APIRouter()
+
+def _validate_standing(days_of_week: List[int], start_date: date, end_date: Optional[date], schedule: ShuttleSchedule):
+    if not days_of_week or any(day < 1 or day > 7 for day in days_of_week):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="days_of_week must contain weekdays between 1 (Monday) and 7 (Sunday)"
+        )
+    
+    # Riders can only stand on days the shuttle actually runs
+    if schedule.days_of_week and not set(days_of_week).issubset(schedule.days_of_week):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="days_of_week must be a subset of the schedule's days"
+        )
+    
+    if end_date and end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+
+async def _get_schedule(db: AsyncSession, schedule_id: UUID) -> ShuttleSchedule:
+    result = await db.execute(
+        select(ShuttleSchedule).where(ShuttleSchedule.id == schedule_id)
+    )
+    schedule = result.scalar_one_or_none()
+    
+    if not schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Schedule not found"
+        )
+    
+    return schedule
+
+async def _reseat(db: AsyncSession, standing: StandingRegistration):
+    # Recount the schedule's seats with the changed rider; refuse to overbook any of its trips
+    if standing.status == 'active':
+        full_date = await reseat_standing(
+            db, standing.schedule_id, standing.start_date, standing.end_date, standing.days_of_week
+        )
+        if full_date:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"This trip is full on {full_date.isoformat()}"
+            )
+    else:
+        await reset_trip_seats(db, [standing.schedule_id])
+    
+    # Seats freed on other dates go to the waitlist
+    await promote_schedule_waitlist(db, standing.schedule_id)
+
+async def _get_standing(db: AsyncSession, standing_id: UUID) -> StandingRegistration:
+    result = await db.execute(
+        select(StandingRegistration).where(StandingRegistration.id == standing_id)
+    )
+    standing = result.scalar_one_or_none()
+    
+    if not standing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Standing registration not found"
+        )
+    
+    return standing
+
+@router.get("/", response_model=List[StandingRegistrationSchema])
+async def get_standing_registrations(
+    schedule_id: Optional[UUID] = None,
+    phone: Optional[str] = None,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    logger_manager.info("Fetching standing registrations", {"user_id": str(current_user.id)})
+    
+    query = select(StandingRegistration)
+    if schedule_id:
+        query = query.where(StandingRegistration.schedule_id == schedule_id)
+    if phone:
+        query = query.where(StandingRegistration.passenger_phone == phone)
+    
+    result = await db.execute(query.order_by(StandingRegistration.start_date, StandingRegistration.passenger_name))
+    return result.scalars().all()
+
+@router.get("/occurrences", response_model=List[StandingOccurrence])
+async def get_standing_occurrences(
+    registration_date: date,
+    schedule_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    # Manifest of the standing riders of one day, expanded on read
+    occurrences = standing_occurrences(registration_date, registration_date)
+    query = select(occurrences)
+    if schedule_id:
+        query = query.where(occurrences.c.schedule_id == schedule_id)
+    
+    result = await db.execute(query.order_by(occurrences.c.passenger_name))
+    return [StandingOccurrence(**row._mapping) for row in result.all()]
+
+@router.get("/{standing_id}", response_model=StandingRegistrationSchema)
+async def get_standing_registration(
+    standing_id: UUID,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    return await _get_standing(db, standing_id)
+
+@router.post("/", response_model=StandingRegistrationSchema)
+async def create_standing_registration(
+    standing_data: StandingRegistrationCreate,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    schedule = await _get_schedule(db, standing_data.schedule_id)
+    _validate_standing(standing_data.days_of_week, standing_data.start_date, standing_data.end_date, schedule)
+    
+    logger_manager.info("Creating standing registration", {
+        "schedule_id": str(standing_data.schedule_id),
+        "user_id": str(current_user.id)
+    })
+    new_standing = StandingRegistration(**standing_data.dict())
+    
+    db.add(new_standing)
+    await db.flush()
+    # Seat counters of this schedule were seeded without the new rider
+    await _reseat(db, new_standing)
+    await db.commit()
+    await db.refresh(new_standing)
+    public_cache.invalidate("registrations")
+    
+    return new_standing
+
+@router.put("/{standing_id}", response_model=StandingRegistrationSchema)
+async def update_standing_registration(
+    standing_id: UUID,
+    standing_data: StandingRegistrationUpdate,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    standing = await _get_standing(db, standing_id)
+    
+    # Update only provided fields
+    update_data = standing_data.dict(exclude_unset=True)
+    if update_data:
+        schedule = await _get_schedule(db, standing.schedule_id)
+        _validate_standing(
+            update_data.get("days_of_week", standing.days_of_week),
+            update_data.get("start_date", standing.start_date),
+            update_data.get("end_date", standing.end_date),
+            schedule
+        )
+        
+        await db.execute(
+            update(StandingRegistration)
+            .where(StandingRegistration.id == standing_id)
+            .values(**update_data)
+        )
+        await db.refresh(standing)
+        await _reseat(db, standing)
+        await db.commit()
+        public_cache.invalidate("registrations")
+    
+    return standing
+
+@router.delete("/{standing_id}", response_model=MessageResponse)
+async def delete_standing_registration(
+    standing_id: UUID,
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    standing = await _get_standing(db, standing_id)
+    
+    await db.execute(
+        delete(StandingRegistration).where(StandingRegistration.id == standing_id)
+    )
+    await reset_trip_seats(db, [standing.schedule_id])
+    await promote_schedule_waitlist(db, standing.schedule_id)
+    await db.commit()
+    public_cache.invalidate("registrations")
+    
+    return MessageResponse(message="Standing registration deleted successfully")
@@ -0,0 +1,185 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from uuid import UUID
+import base64
+import json
+import os
+
+from ..database import get_database_session, async_session
+from ..models import Company, Shuttle, ShuttleSchedule, ShuttleRegistration, DeletedRecord
+from ..logging_manager import logger_manager
+from ..schemas import (
+    Company as CompanySchema, Shuttle as ShuttleSchema, ShuttleSchedule as ScheduleSchema,
+    ShuttleRegistration as RegistrationSchema, SyncResponse, SyncChanges, SyncDeletions
+)
+from ..auth import get_current_active_user, AdminUser
+
+router = APIRouter()
+
+# updated_at is the writing transaction's start time, so a row can become
+# visible after newer ones; cursors trail the clock by this window and
+# clients apply changes idempotently by id
+SYNC_SETTLE_SECONDS = int(os.getenv("SYNC_SETTLE_SECONDS", 5))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+SYNC_TOMBSTONE_PURGE_SECONDS = float(os.getenv("SYNC_TOMBSTONE_PURGE_SECONDS", 3600))
+# Rows per sync response; bigger snapshots are paged with the returned cursor
+SYNC_PAGE_ROWS = int(os.getenv("SYNC_PAGE_ROWS", 1000))
+SYNC_PAGE_MAX_ROWS = 5000
+
+# (response key, model, schema) for every synced table
+SYNC_TABLES = [
+    ("companies", Company, CompanySchema),
+    ("shuttles", Shuttle, ShuttleSchema),
+    ("schedules", ShuttleSchedule, ScheduleSchema),
+    ("registrations", ShuttleRegistration, RegistrationSchema),
+]
+
+class SyncPosition(NamedTuple):
+    """Where a sync round stands.
+
+    A round sends the rows changed since `since` (all rows when `full`),
+    table by table in id order; `until` is the cursor the round ends with.
+    A fresh round has no `until` yet.
+    """
+    since: Optional[datetime]
+    until: Optional[datetime] = None
+    full: bool = False
+    table: int = 0
+    after_id: Optional[UUID] = None
+
+def _encode_cursor(position: SyncPosition) -> str:
+    if position.until is None:
+        payload = {"t": position.since.isoformat()}
+    else:
+        payload = {
+            "t": position.since.isoformat() if position.since else None,
+            "u": position.until.isoformat(),
+            "f": position.full,
+            "k": position.table,
+            "id": str(position.after_id) if position.after_id else None
+        }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+def _parse_timestamp(value) -> datetime:
+    timestamp = datetime.fromisoformat(value)
+    # Compared with timestamptz columns, so a naive time cannot be used
+    if timestamp.tzinfo is None:
+        raise ValueError("naive cursor timestamp")
+    return timestamp
+
+def _decode_cursor(cursor: str) -> SyncPosition:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if "u" not in payload:
+            return SyncPosition(_parse_timestamp(payload["t"]))
+        
+        table = payload["k"]
+        if not isinstance(table, int) or not 0 <= table < len(SYNC_TABLES):
+            raise ValueError("invalid table position")
+        return SyncPosition(
+            since=_parse_timestamp(payload["t"]) if payload["t"] is not None else None,
+            until=_parse_timestamp(payload["u"]),
+            full=bool(payload["f"]),
+            table=table,
+            after_id=UUID(payload["id"]) if payload["id"] is not None else None
+        )
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync cursor"
+        )
+
+@router.get("/", response_model=SyncResponse)
+async def sync_changes(
+    cursor: str = None,
+    limit: int = Query(SYNC_PAGE_ROWS, ge=1, le=SYNC_PAGE_MAX_ROWS),
+    db: AsyncSession = Depends(get_database_session),
+    current_user: AdminUser = Depends(get_current_active_user)
+):
+    position = _decode_cursor(cursor) if cursor else SyncPosition(None)
+    
+    if position.until is None:
+        # A new round: it ends at the current time, minus the settle window
+        now_result = await db.execute(select(func.now()))
+        now = now_result.scalar()
+        # Tombstones older than the retention window may be gone: resend everything
+        full = position.since is None or position.since < now - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+        position = SyncPosition(position.since, now - timedelta(seconds=SYNC_SETTLE_SECONDS), full)
+        first_page = True
+    else:
+        first_page = False
+    
+    # Keyset pages over the tables in order. Rows changed while a round is
+    # paged may be skipped here, but their updated_at is past `until`, so the
+    # next round sends them. Shuttles are sent without company_name; clients
+    # join it from companies
+    changes = {key: [] for key, _, _ in SYNC_TABLES}
+    table, after_id = position.table, position.after_id
+    remaining = limit
+    while table < len(SYNC_TABLES) and remaining > 0:
+        key, model, schema = SYNC_TABLES[table]
+        query = select(model)
+        if not position.full:
+            query = query.where(model.updated_at > position.since)
+        if after_id is not None:
+            query = query.where(model.id > after_id)
+        
+        result = await db.execute(query.order_by(model.id).limit(remaining))
+        rows = result.scalars().all()
+        changes[key] = [schema.model_validate(row) for row in rows]
+        remaining -= len(rows)
+        if remaining > 0:
+            table, after_id = table + 1, None
+        else:
+            after_id = rows[-1].id
+    
+    has_more = table < len(SYNC_TABLES)
+    if has_more:
+        next_cursor = _encode_cursor(position._replace(table=table, after_id=after_id))
+    else:
+        next_cursor = _encode_cursor(SyncPosition(position.until))
+    
+    # Deletions come with the first page of a round
+    deleted = {key: [] for key, _, _ in SYNC_TABLES}
+    if first_page and not position.full:
+        table_keys = {model.__tablename__: key for key, model, _ in SYNC_TABLES}
+        result = await db.execute(
+            select(DeletedRecord.table_name, DeletedRecord.record_id)
+            .where(
+                DeletedRecord.deleted_at > position.since,
+                DeletedRecord.table_name.in_(table_keys.keys())
+            )
+            .order_by(DeletedRecord.id)
+        )
+        for table_name, record_id in result.all():
+            deleted[table_keys[table_name]].append(record_id)
+    
+    logger_manager.info("Sync changes served", {
+        "user_id": str(current_user.id),
+        "full": position.full,
+        "has_more": has_more,
+        "changed": sum(len(rows) for rows in changes.values()),
+        "deleted": sum(len(ids) for ids in deleted.values())
+    })
+    
+    return SyncResponse(
+        cursor=next_cursor,
+        full=position.full,
+        has_more=has_more,
+        changes=SyncChanges(**changes),
+        deleted=SyncDeletions(**deleted)
+    )
+
+async def purge_expired_tombstones():
+    async with async_session() as session:
+        result = await session.execute(
+            delete(DeletedRecord).where(
+                DeletedRecord.deleted_at < func.now() - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+            )
+        )
+        await session.commit()
+    
+    logger_manager.info("Expired sync tombstones purged", {"count": result.rowcount})
@@ -87,6 +87,8 @@ class RegistrationBase(BaseModel):
 
 class RegistrationCreate(RegistrationBase):
     schedule_id: UUID
+    # Join the trip's waitlist instead of failing when it is full
+    waitlist_if_full: bool = False
 
 class RegistrationUpdate(BaseModel):
     passenger_name: Optional[str] = None
@@ -98,11 +100,93 @@ class RegistrationUpdate(BaseModel):
 class ShuttleRegistration(RegistrationBase, TimestampMixin):
     id: UUID
     schedule_id: UUID
-    registration_time: datetime
+    registration_time: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
+# Standing (recurring) registration schemas
+class StandingRegistrationBase(BaseModel):
+    passenger_name: str
+    passenger_phone: str
+    passenger_email: Optional[EmailStr] = None
+    days_of_week: List[int]
+    start_date: date
+    end_date: Optional[date] = None
+    status: Optional[str] = "active"
+
+class StandingRegistrationCreate(StandingRegistrationBase):
+    schedule_id: UUID
+
+class StandingRegistrationUpdate(BaseModel):
+    passenger_name: Optional[str] = None
+    passenger_phone: Optional[str] = None
+    passenger_email: Optional[EmailStr] = None
+    days_of_week: Optional[List[int]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    status: Optional[str] = None
+
+class StandingRegistration(StandingRegistrationBase, TimestampMixin):
+    id: UUID
+    schedule_id: UUID
+    
+    class Config:
+        from_attributes = True
+
+class StandingOccurrence(BaseModel):
+    standing_registration_id: UUID
+    schedule_id: UUID
+    passenger_name: str
+    passenger_phone: str
+    passenger_email: Optional[str] = None
+    registration_date: date
+
+class BulkRegistrationCreate(BaseModel):
+    registrations: List[RegistrationCreate]
+
+class BulkRegistrationResult(BaseModel):
+    index: int
+    success: bool
+    registration_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+class BulkRegistrationResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkRegistrationResult]
+
+# Seat hold schemas
+class SeatHoldCreate(BaseModel):
+    schedule_id: UUID
+    registration_date: date
+    ttl_seconds: Optional[int] = None
+
+class SeatHoldConfirm(BaseModel):
+    passenger_name: str
+    passenger_phone: str
+    passenger_email: Optional[EmailStr] = None
+
+class SeatHoldResponse(BaseModel):
+    hold_id: str
+    schedule_id: UUID
+    registration_date: date
+    expires_in: int
+    available: int
+
+class TripAvailability(BaseModel):
+    schedule_id: UUID
+    registration_date: date
+    capacity: int
+    booked: int
+    held: int
+    available: int
+
+class RegistrationPage(BaseModel):
+    items: List[ShuttleRegistration]
+    next_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None
+
 # Admin User schemas
 class AdminUserBase(BaseModel):
     email: EmailStr
@@ -155,6 +239,32 @@ class ResetPasswordResponse(BaseModel):
     temp_password: Optional[str] = None  # Remove in production
 
 # Generic response schemas
+# CSV import job schemas
+class CSVProcessRequest(BaseModel):
+    shuttle_id: UUID
+    file_path: str
+    import_type: str = "schedules"  # 'schedules' or 'registrations'
+
+class CSVUploadResponse(BaseModel):
+    filename: str
+    originalName: str
+
+class CSVJobResponse(BaseModel):
+    job_id: UUID
+    status: str
+    filename: str
+
+class CSVProcessingLog(TimestampMixin):
+    id: UUID
+    shuttle_id: UUID
+    csv_file_name: str
+    status: str
+    error_message: Optional[str] = None
+    processed_rows: int
+    
+    class Config:
+        from_attributes = True
+
 class MessageResponse(BaseModel):
     message: str
 
@@ -181,4 +291,25 @@ class RouteSchedules(BaseModel):
 
 class OrganizedSchedules(BaseModel):
     savidor_to_tzafrir: RouteSchedules
-    kiryat_aryeh_to_tzafrir: RouteSchedules
\ No newline at end of file
+    kiryat_aryeh_to_tzafrir: RouteSchedules
+
+# Delta sync schemas
+class SyncChanges(BaseModel):
+    companies: List[Company] = []
+    shuttles: List[Shuttle] = []
+    schedules: List[ShuttleSchedule] = []
+    registrations: List[ShuttleRegistration] = []
+
+class SyncDeletions(BaseModel):
+    companies: List[UUID] = []
+    shuttles: List[UUID] = []
+    schedules: List[UUID] = []
+    registrations: List[UUID] = []
+
+class SyncResponse(BaseModel):
+    cursor: str
+    full: bool
+    # More pages of this round follow; fetch them with `cursor`
+    has_more: bool = False
+    changes: SyncChanges
+    deleted: SyncDeletions
@@ -0,0 +1,208 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update, func, cast, Date, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import TripSeat, Shuttle, ShuttleSchedule, ShuttleRegistration, StandingRegistration
+from .standing import standing_active_on, STANDING_EXPORT_DAYS
+
+DEFAULT_CAPACITY = 50
+
+
+def trip_date_of(value) -> date:
+    # registration_date is a DATE column mapped as DateTime; accept both
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _booked_count(schedule_id: UUID, trip_date: date):
+    # Confirmed one-off registrations plus the standing riders of that date
+    confirmed_count = (
+        select(func.count(ShuttleRegistration.id))
+        .where(
+            ShuttleRegistration.schedule_id == schedule_id,
+            cast(ShuttleRegistration.registration_date, Date) == trip_date,
+            ShuttleRegistration.status == 'confirmed'
+        )
+        .scalar_subquery()
+    )
+    standing_count = (
+        select(func.count(StandingRegistration.id))
+        .where(
+            StandingRegistration.schedule_id == schedule_id,
+            *standing_active_on(trip_date)
+        )
+        .scalar_subquery()
+    )
+    return confirmed_count + standing_count
+
+
+async def _recount_trip_seats(db: AsyncSession, *conditions):
+    # Lock the counters first (in a fixed order), then count in a separate
+    # statement: its snapshot starts after the lock is held, so bookings that
+    # were still uncommitted behind the lock are counted too
+    await db.execute(
+        select(TripSeat.schedule_id)
+        .where(*conditions)
+        .order_by(TripSeat.schedule_id, TripSeat.trip_date)
+        .with_for_update()
+    )
+    await db.execute(
+        update(TripSeat)
+        .where(*conditions)
+        .values(booked=_booked_count(TripSeat.schedule_id, TripSeat.trip_date))
+    )
+
+
+async def _seed_trip_seats(db: AsyncSession, schedule_id: UUID, trip_date: date):
+    # An empty counter first; the insert holds its row lock while it is counted
+    result = await db.execute(
+        pg_insert(TripSeat)
+        .values(schedule_id=schedule_id, trip_date=trip_date, booked=0)
+        .on_conflict_do_nothing(index_elements=[TripSeat.schedule_id, TripSeat.trip_date])
+        .returning(TripSeat.schedule_id)
+    )
+    if result.scalar_one_or_none() is not None:
+        await _recount_trip_seats(db, TripSeat.schedule_id == schedule_id, TripSeat.trip_date == trip_date)
+
+
+def _capacity_of(schedule_id: UUID):
+    return (
+        select(func.coalesce(Shuttle.capacity, DEFAULT_CAPACITY))
+        .join(ShuttleSchedule, ShuttleSchedule.shuttle_id == Shuttle.id)
+        .where(ShuttleSchedule.id == schedule_id)
+        .scalar_subquery()
+    )
+
+
+async def get_trip_occupancy(db: AsyncSession, schedule_id: UUID, trip_date: date) -> Optional[Tuple[int, int]]:
+    """Return (capacity, booked) for a trip, or None if the schedule does not exist."""
+    confirmed_count = _booked_count(schedule_id, trip_date)
+    counter = (
+        select(TripSeat.booked)
+        .where(TripSeat.schedule_id == schedule_id, TripSeat.trip_date == trip_date)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            func.coalesce(Shuttle.capacity, DEFAULT_CAPACITY),
+            func.coalesce(counter, confirmed_count)
+        )
+        .join(ShuttleSchedule, ShuttleSchedule.shuttle_id == Shuttle.id)
+        .where(ShuttleSchedule.id == schedule_id)
+    )
+    row = result.first()
+    return (row[0], row[1]) if row else None
+
+
+async def reserve_seats(
+    db: AsyncSession, schedule_id: UUID, trip_date: date, seats: int = 1, held: int = 0
+) -> bool:
+    """Atomically take `seats` on a trip; returns False when it would overbook.
+
+    The conditional UPDATE row-locks the trip's counter only until the
+    caller's transaction ends, so concurrent bookings for the same departure
+    serialize on one short row lock instead of racing a Python-side check.
+    `held` seats (active holds of other passengers) are kept free.
+    """
+    reserve = (
+        update(TripSeat)
+        .where(
+            TripSeat.schedule_id == schedule_id,
+            TripSeat.trip_date == trip_date,
+            TripSeat.booked + seats + held <= _capacity_of(schedule_id)
+        )
+        .values(booked=TripSeat.booked + seats)
+        .returning(TripSeat.booked)
+    )
+
+    result = await db.execute(reserve)
+    if result.scalar_one_or_none() is not None:
+        return True
+
+    # Either the trip is full or its counter does not exist yet
+    await _seed_trip_seats(db, schedule_id, trip_date)
+    result = await db.execute(reserve)
+    return result.scalar_one_or_none() is not None
+
+
+async def reserve_available_seats(
+    db: AsyncSession, schedule_id: UUID, trip_date: date, seats: int, held: int = 0
+) -> int:
+    """Take as many of `seats` as are free on a trip; returns how many were taken.
+
+    For batches (bulk bookings) that are allocated passenger by passenger:
+    the counter stays locked until the caller's transaction ends.
+    """
+    await _seed_trip_seats(db, schedule_id, trip_date)
+    result = await db.execute(
+        select(TripSeat.booked, _capacity_of(schedule_id).label("capacity"))
+        .where(TripSeat.schedule_id == schedule_id, TripSeat.trip_date == trip_date)
+        .with_for_update(of=TripSeat)
+    )
+    counter = result.one()
+    taken = max(min(seats, counter.capacity - counter.booked - held), 0)
+    if taken:
+        await db.execute(
+            update(TripSeat)
+            .where(TripSeat.schedule_id == schedule_id, TripSeat.trip_date == trip_date)
+            .values(booked=TripSeat.booked + taken)
+        )
+    return taken
+
+
+async def release_seats(db: AsyncSession, schedule_id: UUID, trip_date: date, seats: int = 1):
+    await db.execute(
+        update(TripSeat)
+        .where(TripSeat.schedule_id == schedule_id, TripSeat.trip_date == trip_date)
+        .values(booked=func.greatest(TripSeat.booked - seats, 0))
+    )
+
+
+async def reset_trip_seats(db: AsyncSession, schedule_ids: Iterable[UUID]):
+    # For writes that bypass reserve_seats (e.g. CSV imports): recount the
+    # existing counters in place; missing ones are seeded on the next booking
+    schedule_ids = sorted(set(schedule_ids))
+    if schedule_ids:
+        await _recount_trip_seats(db, TripSeat.schedule_id.in_(schedule_ids))
+
+
+async def reseat_standing(
+    db: AsyncSession, schedule_id: UUID, start_date: date, end_date: Optional[date], days_of_week: List[int]
+) -> Optional[date]:
+    """Recount a schedule's seats after a standing registration changed.
+
+    Returns the first upcoming trip of the standing pattern that is now over
+    capacity, or None. Counters of the next STANDING_EXPORT_DAYS are created
+    first, so bookings racing this transaction wait for it instead of
+    seeding a count without the new rider.
+    """
+    today = date.today()
+    first = max(start_date, today)
+    horizon = today + timedelta(days=STANDING_EXPORT_DAYS)
+    last = min(end_date or horizon, horizon)
+    trip_dates = [
+        first + timedelta(days=offset)
+        for offset in range((last - first).days + 1)
+        if (first + timedelta(days=offset)).isoweekday() in days_of_week
+    ]
+    if trip_dates:
+        await db.execute(
+            pg_insert(TripSeat)
+            .values([{"schedule_id": schedule_id, "trip_date": trip_date, "booked": 0} for trip_date in trip_dates])
+            .on_conflict_do_nothing(index_elements=[TripSeat.schedule_id, TripSeat.trip_date])
+        )
+    await reset_trip_seats(db, [schedule_id])
+
+    full_trip = select(TripSeat.trip_date).where(
+        TripSeat.schedule_id == schedule_id,
+        TripSeat.trip_date >= first,
+        cast(func.extract('isodow', TripSeat.trip_date), Integer).in_(days_of_week),
+        TripSeat.booked > _capacity_of(schedule_id)
+    )
+    if end_date:
+        full_trip = full_trip.where(TripSeat.trip_date <= end_date)
+    result = await db.execute(full_trip.order_by(TripSeat.trip_date).limit(1))
+    return result.scalar_one_or_none()
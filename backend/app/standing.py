@@ -0,0 +1,103 @@
+import os
+from datetime import date, time
+from typing import Optional, Union
+
+from sqlalchemy import select, func, cast, text, true, Date, Integer
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.sql.elements import ColumnElement
+
+from .models import StandingRegistration, ShuttleSchedule
+
+# How far ahead open-ended standing registrations are expanded in exports
+STANDING_EXPORT_DAYS = int(os.getenv("STANDING_EXPORT_DAYS", 31))
+
+# A trip date is either a Python date or a SQL date expression (e.g. a
+# generate_series column or CURRENT_DATE)
+TripDate = Union[date, ColumnElement]
+
+
+def standing_active_on(trip_date: TripDate) -> list:
+    """WHERE conditions selecting the standing registrations that ride on `trip_date`."""
+    if isinstance(trip_date, date):
+        weekday = [trip_date.isoweekday()]
+    else:
+        weekday = array([cast(func.extract('isodow', trip_date), Integer)])
+
+    return [
+        StandingRegistration.status == 'active',
+        StandingRegistration.start_date <= trip_date,
+        func.coalesce(StandingRegistration.end_date, trip_date) >= trip_date,
+        StandingRegistration.days_of_week.contains(weekday),
+    ]
+
+
+def standing_counts_on(trip_date: TripDate):
+    """Subquery of (schedule_id, standing_count) for one trip date."""
+    return (
+        select(
+            StandingRegistration.schedule_id,
+            func.count(StandingRegistration.id).label('standing_count')
+        )
+        .where(*standing_active_on(trip_date))
+        .group_by(StandingRegistration.schedule_id)
+        .subquery()
+    )
+
+
+def standing_public_query(
+    columns,
+    trip_date: date,
+    time_slot: Optional[time] = None,
+    route_type: str = None,
+    direction: str = None
+):
+    """Select `columns` over the standing riders of `trip_date`, filtered like
+    the public registration counts (slot, route and direction come from the schedule)."""
+    query = (
+        select(*columns)
+        .select_from(StandingRegistration)
+        .join(ShuttleSchedule, StandingRegistration.schedule_id == ShuttleSchedule.id)
+        .where(*standing_active_on(trip_date))
+    )
+
+    if time_slot:
+        query = query.where(ShuttleSchedule.departure_time == time_slot)
+
+    if route_type:
+        query = query.where(ShuttleSchedule.route_type == route_type)
+
+    if direction:
+        query = query.where(ShuttleSchedule.direction == direction)
+
+    return query
+
+
+def standing_occurrences(start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Subquery expanding standing registrations into one row per trip date.
+
+    Dates are generated on the fly between the requested bounds; open-ended
+    registrations stop STANDING_EXPORT_DAYS after today when no end is given.
+    """
+    horizon = end_date or (func.current_date() + STANDING_EXPORT_DAYS)
+    lower = StandingRegistration.start_date
+    if start_date:
+        lower = func.greatest(lower, start_date)
+    upper = func.least(func.coalesce(StandingRegistration.end_date, horizon), horizon)
+
+    series = func.generate_series(lower, upper, text("interval '1 day'")).table_valued("value").lateral("trip_dates")
+    trip_date = cast(series.c.value, Date)
+
+    return (
+        select(
+            StandingRegistration.id.label('standing_registration_id'),
+            StandingRegistration.schedule_id,
+            StandingRegistration.passenger_name,
+            StandingRegistration.passenger_phone,
+            StandingRegistration.passenger_email,
+            trip_date.label('registration_date')
+        )
+        .select_from(StandingRegistration)
+        .join(series, true())
+        .where(*standing_active_on(trip_date))
+        .subquery()
+    )
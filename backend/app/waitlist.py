@@ -0,0 +1,96 @@
+from datetime import date
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import select, update, cast, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import async_session
+from .cache import public_cache
+from .models import ShuttleRegistration
+from .seats import reserve_seats
+from .holds import seat_holds
+from .logging_manager import logger_manager
+
+WAITLISTED = 'waitlisted'
+
+
+def waitlist_head(schedule_id: UUID, trip_date: date):
+    # Served by the partial idx_registrations_waitlist index: the head of the
+    # line is its first entry, however long the line is
+    return (
+        select(ShuttleRegistration.id)
+        .where(
+            ShuttleRegistration.schedule_id == schedule_id,
+            cast(ShuttleRegistration.registration_date, Date) == trip_date,
+            ShuttleRegistration.status == WAITLISTED
+        )
+        .order_by(ShuttleRegistration.registration_time, ShuttleRegistration.id)
+        .limit(1)
+    )
+
+
+async def promote_waitlisted(db: AsyncSession, schedule_id: UUID, trip_date: date) -> List[UUID]:
+    """Confirm waitlisted passengers into the trip's free seats, first come first served.
+
+    Runs inside the caller's transaction (e.g. the cancellation that freed the
+    seat), so the cancellation and the promotion commit or roll back together.
+    """
+    promoted = []
+    trip = (schedule_id, trip_date)
+    while True:
+        # SKIP LOCKED: a concurrent cancellation promotes the next passenger in line
+        result = await db.execute(waitlist_head(*trip).with_for_update(skip_locked=True))
+        registration_id = result.scalar_one_or_none()
+        if registration_id is None:
+            break
+        if not await reserve_seats(db, *trip, held=seat_holds.held(trip)):
+            break
+
+        await db.execute(
+            update(ShuttleRegistration)
+            .where(ShuttleRegistration.id == registration_id)
+            .values(status='confirmed')
+        )
+        promoted.append(registration_id)
+
+    if promoted:
+        logger_manager.info("Promoted passengers from the waitlist", {
+            "schedule_id": str(schedule_id),
+            "trip_date": trip_date.isoformat(),
+            "promoted": len(promoted)
+        })
+    return promoted
+
+
+async def promote_schedule_waitlist(db: AsyncSession, schedule_id: UUID) -> List[UUID]:
+    """Promote the waitlists of every upcoming trip of a schedule (e.g. after a standing rider left)."""
+    result = await db.execute(
+        select(cast(ShuttleRegistration.registration_date, Date))
+        .where(
+            ShuttleRegistration.schedule_id == schedule_id,
+            cast(ShuttleRegistration.registration_date, Date) >= date.today(),
+            ShuttleRegistration.status == WAITLISTED
+        )
+        .distinct()
+    )
+    promoted = []
+    for trip_date in sorted(result.scalars().all()):
+        promoted += await promote_waitlisted(db, schedule_id, trip_date)
+    return promoted
+
+
+async def promote_after_expired_holds():
+    """Offer the seats of expired holds to the trips' waitlists (run periodically)."""
+    trips = sorted(seat_holds.take_expired_trips())
+    for position, trip in enumerate(trips):
+        try:
+            async with async_session() as session:
+                promoted = await promote_waitlisted(session, *trip)
+                await session.commit()
+        except Exception:
+            # Retried at the next sweep
+            seat_holds.requeue_expired_trips(trips[position:])
+            raise
+        if promoted:
+            public_cache.invalidate("registrations")
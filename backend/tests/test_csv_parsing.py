@@ -0,0 +1,110 @@
+import asyncio
+import io
+
+import pytest
+
+from app import csv_parsing
+from app.csv_parsing import (
+    CSVBlock, CSVImportError, RowError, parse_blocks, parse_registration_block, read_csv_blocks
+)
+
+SCHEDULE_ID = "6f1c2a9e-4b7d-4c1e-9a3f-2d8e5b7c1a04"
+HEADER = "schedule_id,passenger_name,passenger_phone,registration_date\n"
+
+
+def registration_row(name: str, phone: str, day: str = "2026-03-01") -> str:
+    return f"{SCHEDULE_ID},{name},{phone},{day}\n"
+
+
+def test_blocks_keep_the_header_and_file_row_numbers():
+    rows = [registration_row(f"Passenger {i}", f"050000000{i}") for i in range(5)]
+    blocks = list(read_csv_blocks(io.StringIO(HEADER + "".join(rows)), chunk_rows=2))
+
+    assert [block.first_row for block in blocks] == [0, 2, 4]
+    assert all(block.header == HEADER for block in blocks)
+    assert "".join(block.text for block in blocks) == "".join(rows)
+
+
+def test_quoted_line_break_is_not_split_across_blocks():
+    rows = [
+        registration_row("Dana", "0501111111"),
+        f'{SCHEDULE_ID},"Noa\nLevi",0502222222,2026-03-01\n',
+        registration_row("Avi", "0503333333"),
+    ]
+    blocks = list(read_csv_blocks(io.StringIO(HEADER + "".join(rows)), chunk_rows=2))
+
+    assert [block.first_row for block in blocks] == [0, 2]
+    parsed = parse_registration_block(blocks[0])
+    assert parsed.errors == []
+    assert list(parsed.data["passenger_name"]) == ["Dana", "Noa\nLevi"]
+
+
+def test_file_without_rows_yields_one_block_for_the_header_check():
+    blocks = list(read_csv_blocks(io.StringIO("passenger_name\n")))
+
+    assert blocks == [CSVBlock("passenger_name\n", "", 0)]
+    with pytest.raises(CSVImportError):
+        parse_registration_block(blocks[0])
+
+
+def test_empty_file_is_rejected():
+    with pytest.raises(CSVImportError):
+        list(read_csv_blocks(io.StringIO("")))
+
+
+def test_row_errors_are_numbered_across_blocks():
+    rows = [
+        registration_row("Dana", "0501111111"),
+        registration_row("Noa", "0502222222"),
+        registration_row("", "0503333333"),
+        registration_row("Avi", "not a phone"),
+    ]
+    blocks = read_csv_blocks(io.StringIO(HEADER + "".join(rows)), chunk_rows=2)
+    errors = [error for block in blocks for error in parse_registration_block(block).errors]
+
+    assert errors == [RowError(3, "Missing passenger_name"), RowError(4, "Invalid passenger_phone")]
+
+
+def test_dates_do_not_depend_on_the_first_value_of_the_block():
+    rows = [
+        registration_row("Dana", "0501111111", "03/01/2026"),
+        registration_row("Noa", "0502222222", "2026-03-02"),
+        registration_row("Avi", "0503333333", "2026-03-03T07:30:00"),
+    ]
+    block = next(read_csv_blocks(io.StringIO(HEADER + "".join(rows))))
+    parsed = parse_registration_block(block)
+
+    assert parsed.errors == []
+    assert [d.isoformat() for d in parsed.data["registration_date"]] == ["2026-03-01", "2026-03-02", "2026-03-03"]
+
+
+def test_duplicate_trip_keeps_the_last_row_and_reports_the_others():
+    rows = [
+        registration_row("Dana", "050-111-1111", "2026-03-01"),
+        registration_row("Dana Cohen", "0501111111", "2026-03-01 08:00"),
+        registration_row("Noa", "0502222222"),
+    ]
+    block = next(read_csv_blocks(io.StringIO(HEADER + "".join(rows))))
+    parsed = parse_registration_block(block)
+
+    assert list(parsed.data["passenger_name"]) == ["Dana Cohen", "Noa"]
+    assert parsed.errors == [RowError(1, "Duplicate of row 2 (same passenger and trip)")]
+
+
+def test_parse_blocks_yields_results_in_file_order(monkeypatch):
+    monkeypatch.setattr(csv_parsing, "CSV_PARSE_MAX_PENDING", 2)
+    rows = [registration_row(f"Passenger {i}", f"05000000{i:02d}") for i in range(7)]
+    blocks = read_csv_blocks(io.StringIO(HEADER + "".join(rows)), chunk_rows=2)
+
+    async def parse_all():
+        return [chunk async for chunk in parse_blocks(blocks, parse_registration_block)]
+
+    try:
+        chunks = asyncio.run(parse_all())
+    finally:
+        csv_parsing.shutdown_parse_pool()
+
+    assert [chunk.rows for chunk in chunks] == [2, 2, 2, 1]
+    names = [name for chunk in chunks for name in chunk.data["passenger_name"]]
+    assert names == [f"Passenger {i}" for i in range(7)]
+    assert [list(chunk.data.index) for chunk in chunks][-1] == [6]
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app import idempotency
+from app.cache import TTLCache
+from app.idempotency import IdempotencyMiddleware
+
+
+class FakeKeyStore:
+    """The idempotency_keys table: key -> StoredResponse, None while claimed."""
+
+    def __init__(self):
+        self.records = {}
+        self.renewed = []
+
+    async def claim(self, key, request_hash):
+        if key in self.records:
+            return False
+        self.records[key] = None
+        return True
+
+    async def load(self, key):
+        return self.records.get(key)
+
+    async def complete(self, key, response):
+        self.records[key] = response
+        idempotency.stored_responses.set(key, response)
+
+    async def release(self, key):
+        self.records.pop(key, None)
+
+    async def renew_claim(self, key):
+        self.renewed.append(key)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FakeKeyStore()
+    monkeypatch.setattr(idempotency, "_claim", store.claim)
+    monkeypatch.setattr(idempotency, "_load", store.load)
+    monkeypatch.setattr(idempotency, "_complete", store.complete)
+    monkeypatch.setattr(idempotency, "_release", store.release)
+    monkeypatch.setattr(idempotency, "_renew_claim", store.renew_claim)
+    monkeypatch.setattr(idempotency, "stored_responses", TTLCache(60, 16))
+    return store
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(calls):
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware)
+
+    @app.post("/api/registrations/")
+    async def create(payload: dict, seats: int = 1):
+        calls.append((payload, seats))
+        if payload.get("fail"):
+            raise HTTPException(status_code=503, detail="Try again")
+        return {"id": len(calls), "seats": seats}
+
+    @app.post("/api/registrations/slow")
+    async def slow():
+        calls.append("slow")
+        await asyncio.sleep(0.35)
+        return {"done": True}
+
+    return TestClient(app)
+
+
+def post(client, path, key="key-1", json=None, token="token-a"):
+    return client.post(
+        path, json=json or {"name": "Dana"},
+        headers={"Idempotency-Key": key, "Authorization": f"Bearer {token}"}
+    )
+
+
+def test_retry_replays_the_recorded_response(store, client, calls):
+    first = post(client, "/api/registrations/?seats=2")
+    retry = post(client, "/api/registrations/?seats=2")
+
+    assert retry.status_code == first.status_code == 200
+    assert retry.json() == first.json() == {"id": 1, "seats": 2}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert len(calls) == 1
+
+
+def test_replay_survives_a_cold_cache(store, client, calls, monkeypatch):
+    post(client, "/api/registrations/")
+    monkeypatch.setattr(idempotency, "stored_responses", TTLCache(60, 16))
+
+    assert post(client, "/api/registrations/").json() == {"id": 1, "seats": 1}
+    assert len(calls) == 1
+
+
+def test_key_reused_with_another_body_or_query_is_rejected(store, client, calls):
+    post(client, "/api/registrations/?seats=1")
+
+    assert post(client, "/api/registrations/?seats=1", json={"name": "Noa"}).status_code == 422
+    assert post(client, "/api/registrations/?seats=2").status_code == 422
+    assert len(calls) == 1
+
+
+def test_keys_are_scoped_to_the_caller(store, client, calls):
+    post(client, "/api/registrations/", token="token-a")
+    other = post(client, "/api/registrations/", token="token-b")
+
+    assert other.json() == {"id": 2, "seats": 1}
+    assert "idempotent-replayed" not in other.headers
+
+
+def test_request_in_flight_gets_a_conflict(store, client, calls, monkeypatch):
+    first = post(client, "/api/registrations/")
+    # The same key claimed elsewhere, its response not recorded yet
+    store.records[next(iter(store.records))] = None
+    monkeypatch.setattr(idempotency, "stored_responses", TTLCache(60, 16))
+
+    retry = post(client, "/api/registrations/")
+    assert first.status_code == 200
+    assert retry.status_code == 409
+    assert len(calls) == 1
+
+
+def test_server_errors_are_not_recorded(store, client, calls):
+    assert post(client, "/api/registrations/", json={"fail": True}).status_code == 503
+    assert store.records == {}
+    assert post(client, "/api/registrations/", json={"fail": True}).status_code == 503
+    assert len(calls) == 2
+
+
+def test_long_request_keeps_its_claim(store, client, calls, monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_LOCK_TIMEOUT", 0.3)
+
+    assert post(client, "/api/registrations/slow").status_code == 200
+    assert len(store.renewed) >= 2
+    assert len(set(store.renewed)) == 1
+
+
+def test_requests_without_a_key_pass_through(store, client, calls):
+    client.post("/api/registrations/", json={"name": "Dana"})
+    client.post("/api/registrations/", json={"name": "Dana"})
+
+    assert len(calls) == 2
+    assert store.records == {}
+
+
+def test_invalid_key_is_rejected(store, client, calls):
+    assert post(client, "/api/registrations/", key="k" * 256).status_code == 400
+    assert calls == []
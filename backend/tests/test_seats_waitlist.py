@@ -0,0 +1,196 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import holds, waitlist
+from app.holds import SeatHolds
+from app.seats import release_seats, reserve_available_seats, reserve_seats
+from app.waitlist import promote_after_expired_holds, promote_waitlisted
+
+TRIP = (uuid.UUID("6f1c2a9e-4b7d-4c1e-9a3f-2d8e5b7c1a04"), date(2026, 3, 1))
+
+
+class FakeResult:
+    def __init__(self, value=None, row=None):
+        self.value = value
+        self.row = row
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def one(self):
+        return self.row
+
+
+class FakeTripDB:
+    """One trip's seat counter and registrations, driven by the statements the seat code sends.
+
+    `booked` is None until the counter row exists; seeding recounts the
+    confirmed registrations, like the database does.
+    """
+
+    def __init__(self, capacity: int, booked=None, registrations=None):
+        self.capacity = capacity
+        self.booked = booked
+        # id -> status, in registration order
+        self.registrations = dict(registrations or {})
+        self.commits = 0
+
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        sql = " ".join(str(compiled).split())
+        params = compiled.params
+
+        if sql.startswith("INSERT INTO trip_seats"):
+            if self.booked is not None:
+                return FakeResult()
+            self.booked = 0
+            return FakeResult(TRIP[0])
+        if sql.startswith("SELECT trip_seats.schedule_id"):
+            return FakeResult()
+        if sql.startswith("UPDATE trip_seats SET booked=((SELECT count"):
+            self.booked = list(self.registrations.values()).count("confirmed")
+            return FakeResult()
+        if sql.startswith("SELECT trip_seats.booked"):
+            return FakeResult(row=type("Counter", (), {"booked": self.booked, "capacity": self.capacity}))
+        if sql.startswith("UPDATE trip_seats SET booked=greatest"):
+            self.booked = max(self.booked - params["booked_1"], 0)
+            return FakeResult()
+        if sql.startswith("UPDATE trip_seats SET booked=(trip_seats.booked +"):
+            seats = params["booked_1"]
+            if "<=" in sql:
+                if self.booked is None or self.booked + seats + params["param_1"] > self.capacity:
+                    return FakeResult()
+            self.booked += seats
+            return FakeResult(self.booked)
+        if sql.startswith("SELECT shuttle_registrations.id"):
+            waiting = [rid for rid, status in self.registrations.items() if status == "waitlisted"]
+            return FakeResult(waiting[0] if waiting else None)
+        if sql.startswith("UPDATE shuttle_registrations"):
+            self.registrations[params["id_1"]] = params["status"]
+            return FakeResult()
+        raise AssertionError(f"Unexpected statement: {sql}")
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(holds.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def trip_holds(monkeypatch):
+    seat_holds = SeatHolds()
+    monkeypatch.setattr(waitlist, "seat_holds", seat_holds)
+    return seat_holds
+
+
+def test_reserve_seats_seeds_the_counter_from_existing_bookings():
+    db = FakeTripDB(capacity=2, registrations={"r1": "confirmed"})
+
+    assert asyncio.run(reserve_seats(db, *TRIP))
+    assert not asyncio.run(reserve_seats(db, *TRIP))
+    assert db.booked == 2
+
+
+def test_reserve_seats_keeps_held_seats_free():
+    db = FakeTripDB(capacity=3, booked=1)
+
+    assert not asyncio.run(reserve_seats(db, *TRIP, seats=1, held=2))
+    assert asyncio.run(reserve_seats(db, *TRIP, seats=1, held=1))
+    assert db.booked == 2
+
+
+def test_reserve_available_seats_takes_only_the_free_seats():
+    db = FakeTripDB(capacity=5, booked=3)
+
+    assert asyncio.run(reserve_available_seats(db, *TRIP, seats=3, held=1)) == 1
+    assert asyncio.run(reserve_available_seats(db, *TRIP, seats=3, held=1)) == 0
+    assert db.booked == 4
+
+
+def test_reserve_available_seats_on_an_overbooked_trip_takes_none():
+    db = FakeTripDB(capacity=2, booked=3)
+
+    assert asyncio.run(reserve_available_seats(db, *TRIP, seats=1)) == 0
+    assert db.booked == 3
+
+
+def test_released_seats_can_be_reserved_again():
+    db = FakeTripDB(capacity=1, booked=1)
+
+    asyncio.run(release_seats(db, *TRIP))
+    assert asyncio.run(reserve_seats(db, *TRIP))
+    asyncio.run(release_seats(db, *TRIP, seats=5))
+    assert db.booked == 0
+
+
+def test_waitlist_is_promoted_first_come_first_served(trip_holds):
+    db = FakeTripDB(capacity=3, booked=1, registrations={"a": "waitlisted", "b": "waitlisted", "c": "waitlisted"})
+
+    assert asyncio.run(promote_waitlisted(db, *TRIP)) == ["a", "b"]
+    assert db.registrations == {"a": "confirmed", "b": "confirmed", "c": "waitlisted"}
+    assert db.booked == 3
+
+
+def test_waitlist_promotion_leaves_held_seats_alone(trip_holds, clock):
+    trip_holds.create(TRIP)
+    db = FakeTripDB(capacity=2, booked=0, registrations={"a": "waitlisted", "b": "waitlisted"})
+
+    assert asyncio.run(promote_waitlisted(db, *TRIP)) == ["a"]
+
+
+def test_expired_holds_are_reported_once(trip_holds, clock):
+    other_trip = (TRIP[0], date(2026, 3, 2))
+    trip_holds.create(TRIP, ttl=10)
+    released = trip_holds.create(other_trip, ttl=10)
+    trip_holds.release(released.hold_id)
+
+    assert trip_holds.take_expired_trips() == set()
+    clock[0] += 11
+    assert trip_holds.held(TRIP) == 0
+    assert trip_holds.take_expired_trips() == {TRIP}
+    assert trip_holds.take_expired_trips() == set()
+
+
+def test_expired_holds_promote_the_waitlist(monkeypatch, trip_holds, clock):
+    trip_holds.create(TRIP, ttl=10)
+    db = FakeTripDB(capacity=1, booked=0, registrations={"a": "waitlisted"})
+
+    @asynccontextmanager
+    async def fake_session():
+        yield db
+
+    monkeypatch.setattr(waitlist, "async_session", fake_session)
+    asyncio.run(promote_after_expired_holds())
+    assert db.registrations == {"a": "waitlisted"}
+
+    clock[0] += 11
+    asyncio.run(promote_after_expired_holds())
+    assert db.registrations == {"a": "confirmed"}
+    assert db.commits == 1
+
+
+def test_failed_promotion_is_retried_at_the_next_sweep(monkeypatch, trip_holds, clock):
+    later_trip = (TRIP[0], date(2026, 3, 2))
+    trip_holds.create(TRIP, ttl=10)
+    trip_holds.create(later_trip, ttl=10)
+    clock[0] += 11
+
+    @asynccontextmanager
+    async def unavailable_session():
+        raise ConnectionError("database is down")
+        yield
+
+    monkeypatch.setattr(waitlist, "async_session", unavailable_session)
+    with pytest.raises(ConnectionError):
+        asyncio.run(promote_after_expired_holds())
+    assert trip_holds.take_expired_trips() == {TRIP, later_trip}
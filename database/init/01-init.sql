@@ -46,10 +46,11 @@ CREATE TABLE IF NOT EXISTS shuttle_registrations (
     schedule_id UUID REFERENCES shuttle_schedules(id) ON DELETE CASCADE,
     passenger_name VARCHAR(255) NOT NULL,
     passenger_phone VARCHAR(50) NOT NULL,
+    passenger_phone_normalized VARCHAR(50) GENERATED ALWAYS AS (regexp_replace(passenger_phone, '\D', '', 'g')) STORED,
     passenger_email VARCHAR(255),
     registration_date DATE NOT NULL,
     registration_time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    status VARCHAR(50) DEFAULT 'confirmed', -- 'confirmed', 'cancelled', 'completed'
+    status VARCHAR(50) DEFAULT 'confirmed', -- 'confirmed', 'waitlisted', 'cancelled', 'completed'
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -67,13 +68,84 @@ CREATE TABLE IF NOT EXISTS admin_users (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Create csv_processing_logs table (background CSV import jobs)
+CREATE TABLE IF NOT EXISTS csv_processing_logs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    shuttle_id UUID NOT NULL REFERENCES shuttles(id) ON DELETE CASCADE,
+    csv_file_name VARCHAR(255) NOT NULL,
+    status VARCHAR(50) DEFAULT 'pending', -- 'pending', 'processing', 'success', 'error'
+    error_message TEXT,
+    processed_rows INTEGER DEFAULT 0,
+    owner VARCHAR(100), -- API instance running the job
+    heartbeat_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP, -- renewed while the job is unfinished
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create trip_seats table (per-departure seat counters)
+CREATE TABLE IF NOT EXISTS trip_seats (
+    schedule_id UUID REFERENCES shuttle_schedules(id) ON DELETE CASCADE,
+    trip_date DATE NOT NULL,
+    booked INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (schedule_id, trip_date)
+);
+
+-- Create standing_registrations table (recurring riders, expanded per trip date on read)
+CREATE TABLE IF NOT EXISTS standing_registrations (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    schedule_id UUID REFERENCES shuttle_schedules(id) ON DELETE CASCADE,
+    passenger_name VARCHAR(255) NOT NULL,
+    passenger_phone VARCHAR(50) NOT NULL,
+    passenger_email VARCHAR(255),
+    days_of_week INTEGER[] NOT NULL, -- 1=Monday, 7=Sunday
+    start_date DATE NOT NULL,
+    end_date DATE, -- open-ended when NULL
+    status VARCHAR(50) DEFAULT 'active', -- 'active', 'cancelled'
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create idempotency_keys table (recorded responses of retried write requests)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key VARCHAR(64) PRIMARY KEY, -- sha256 of method, path and the client's Idempotency-Key
+    request_hash VARCHAR(64) NOT NULL,
+    status_code INTEGER, -- NULL while the first request is in flight
+    response_body BYTEA,
+    content_type VARCHAR(100),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create deleted_records table (tombstones for delta sync)
+CREATE TABLE IF NOT EXISTS deleted_records (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    record_id UUID NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_shuttles_company_id ON shuttles(company_id);
 CREATE INDEX IF NOT EXISTS idx_schedules_shuttle_id ON shuttle_schedules(shuttle_id);
 CREATE INDEX IF NOT EXISTS idx_schedules_route_direction ON shuttle_schedules(route_type, direction);
+CREATE INDEX IF NOT EXISTS idx_schedules_days_of_week ON shuttle_schedules USING GIN (days_of_week);
 CREATE INDEX IF NOT EXISTS idx_registrations_schedule_id ON shuttle_registrations(schedule_id);
 CREATE INDEX IF NOT EXISTS idx_registrations_date ON shuttle_registrations(registration_date);
+CREATE INDEX IF NOT EXISTS idx_registrations_schedule_date ON shuttle_registrations(schedule_id, registration_date) WHERE status = 'confirmed';
 CREATE INDEX IF NOT EXISTS idx_admin_users_email ON admin_users(email);
+CREATE INDEX IF NOT EXISTS idx_companies_updated_at ON companies(updated_at);
+CREATE INDEX IF NOT EXISTS idx_shuttles_updated_at ON shuttles(updated_at);
+CREATE INDEX IF NOT EXISTS idx_schedules_updated_at ON shuttle_schedules(updated_at);
+CREATE INDEX IF NOT EXISTS idx_registrations_updated_at ON shuttle_registrations(updated_at);
+CREATE INDEX IF NOT EXISTS idx_registrations_time_id ON shuttle_registrations(registration_time, id);
+CREATE INDEX IF NOT EXISTS idx_registrations_phone_time_id ON shuttle_registrations(passenger_phone_normalized, registration_time, id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_registrations_trip ON shuttle_registrations(schedule_id, registration_date, passenger_phone_normalized);
+CREATE INDEX IF NOT EXISTS idx_registrations_waitlist ON shuttle_registrations(schedule_id, registration_date, registration_time, id) WHERE status = 'waitlisted';
+CREATE INDEX IF NOT EXISTS idx_deleted_records_deleted_at ON deleted_records(deleted_at);
+CREATE INDEX IF NOT EXISTS idx_csv_processing_logs_shuttle_created ON csv_processing_logs(shuttle_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_csv_processing_logs_unfinished ON csv_processing_logs(heartbeat_at) WHERE status IN ('pending', 'processing');
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON idempotency_keys(created_at);
+CREATE INDEX IF NOT EXISTS idx_standing_schedule_active ON standing_registrations(schedule_id, start_date) WHERE status = 'active';
 
 -- Create update trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -97,9 +169,61 @@ CREATE TRIGGER update_schedules_updated_at BEFORE UPDATE ON shuttle_schedules
 CREATE TRIGGER update_registrations_updated_at BEFORE UPDATE ON shuttle_registrations
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_standing_registrations_updated_at BEFORE UPDATE ON standing_registrations
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_csv_processing_logs_updated_at BEFORE UPDATE ON csv_processing_logs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_admin_users_updated_at BEFORE UPDATE ON admin_users
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Change notifications for the backend change feed (one per statement, so
+-- bulk imports send a single event per table)
+CREATE OR REPLACE FUNCTION notify_table_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('shuttle_changes', json_build_object('table', TG_TABLE_NAME, 'op', lower(TG_OP))::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_companies_change AFTER INSERT OR UPDATE OR DELETE ON companies
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER notify_shuttles_change AFTER INSERT OR UPDATE OR DELETE ON shuttles
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER notify_schedules_change AFTER INSERT OR UPDATE OR DELETE ON shuttle_schedules
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER notify_registrations_change AFTER INSERT OR UPDATE OR DELETE ON shuttle_registrations
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER notify_standing_registrations_change AFTER INSERT OR UPDATE OR DELETE ON standing_registrations
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+-- Tombstones for delta sync
+CREATE OR REPLACE FUNCTION record_deletion()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO deleted_records (table_name, record_id) VALUES (TG_TABLE_NAME, OLD.id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER record_companies_deletion AFTER DELETE ON companies
+    FOR EACH ROW EXECUTE FUNCTION record_deletion();
+
+CREATE TRIGGER record_shuttles_deletion AFTER DELETE ON shuttles
+    FOR EACH ROW EXECUTE FUNCTION record_deletion();
+
+CREATE TRIGGER record_schedules_deletion AFTER DELETE ON shuttle_schedules
+    FOR EACH ROW EXECUTE FUNCTION record_deletion();
+
+CREATE TRIGGER record_registrations_deletion AFTER DELETE ON shuttle_registrations
+    FOR EACH ROW EXECUTE FUNCTION record_deletion();
+
 -- Insert default admin user (password: admin123)
 -- Note: In production, change this immediately!
 INSERT INTO admin_users (email, password_hash, full_name, role)
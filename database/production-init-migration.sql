@@ -40,6 +40,34 @@ BEGIN
 END;
 $$;
 
+--
+-- Name: notify_table_change(); Type: FUNCTION; Schema: public; Owner: postgres
+--
+
+CREATE OR REPLACE FUNCTION public.notify_table_change()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    PERFORM pg_notify('shuttle_changes', json_build_object('table', TG_TABLE_NAME, 'op', lower(TG_OP))::text);
+    RETURN NULL;
+END;
+$$;
+
+--
+-- Name: record_deletion(); Type: FUNCTION; Schema: public; Owner: postgres
+--
+
+CREATE OR REPLACE FUNCTION public.record_deletion()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    INSERT INTO deleted_records (table_name, record_id) VALUES (TG_TABLE_NAME, OLD.id);
+    RETURN OLD;
+END;
+$$;
+
 -- Create admin_users table
 CREATE TABLE IF NOT EXISTS admin_users (
     id uuid DEFAULT uuid_generate_v4() NOT NULL,
@@ -75,6 +103,49 @@ CREATE TABLE IF NOT EXISTS csv_processing_logs (
     error_message text,
     created_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     processed_rows integer DEFAULT 0,
+    owner character varying(100),
+    heartbeat_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
+    updated_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create trip_seats table (per-departure seat counters)
+CREATE TABLE IF NOT EXISTS trip_seats (
+    schedule_id uuid NOT NULL,
+    trip_date date NOT NULL,
+    booked integer DEFAULT 0 NOT NULL,
+    updated_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create idempotency_keys table (recorded responses of retried write requests)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key character varying(64) NOT NULL,
+    request_hash character varying(64) NOT NULL,
+    status_code integer,
+    response_body bytea,
+    content_type character varying(100),
+    created_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create deleted_records table (tombstones for delta sync)
+CREATE TABLE IF NOT EXISTS deleted_records (
+    id bigserial NOT NULL,
+    table_name character varying(100) NOT NULL,
+    record_id uuid NOT NULL,
+    deleted_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create standing_registrations table (recurring riders, expanded per trip date on read)
+CREATE TABLE IF NOT EXISTS standing_registrations (
+    id uuid DEFAULT uuid_generate_v4() NOT NULL,
+    schedule_id uuid,
+    passenger_name character varying(255) NOT NULL,
+    passenger_phone character varying(50) NOT NULL,
+    passenger_email character varying(255),
+    days_of_week integer[] NOT NULL,
+    start_date date NOT NULL,
+    end_date date,
+    status character varying(50) DEFAULT 'active'::character varying,
+    created_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     updated_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -84,6 +155,7 @@ CREATE TABLE IF NOT EXISTS shuttle_registrations (
     schedule_id uuid,
     passenger_name character varying(255) NOT NULL,
     passenger_phone character varying(50) NOT NULL,
+    passenger_phone_normalized character varying(50) GENERATED ALWAYS AS (regexp_replace((passenger_phone)::text, '\D'::text, ''::text, 'g'::text)) STORED,
     passenger_email character varying(255),
     registration_date date NOT NULL,
     registration_time timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
@@ -126,19 +198,30 @@ CREATE TABLE IF NOT EXISTS shuttles (
     is_active boolean DEFAULT true
 );
 
+-- Add columns missing from tables created by earlier versions
+ALTER TABLE shuttle_registrations ADD COLUMN IF NOT EXISTS passenger_phone_normalized character varying(50) GENERATED ALWAYS AS (regexp_replace((passenger_phone)::text, '\D'::text, ''::text, 'g'::text)) STORED;
+ALTER TABLE csv_processing_logs ADD COLUMN IF NOT EXISTS owner character varying(100);
+ALTER TABLE csv_processing_logs ADD COLUMN IF NOT EXISTS heartbeat_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP;
+
 -- Add constraints
 ALTER TABLE ONLY admin_users ADD CONSTRAINT admin_users_email_key UNIQUE (email);
 ALTER TABLE ONLY admin_users ADD CONSTRAINT admin_users_pkey PRIMARY KEY (id);
 ALTER TABLE ONLY companies ADD CONSTRAINT companies_pkey PRIMARY KEY (id);
 ALTER TABLE ONLY companies ADD CONSTRAINT companies_shuttle_number_key UNIQUE (shuttle_number);
 ALTER TABLE ONLY csv_processing_logs ADD CONSTRAINT csv_processing_logs_pkey PRIMARY KEY (id);
+ALTER TABLE ONLY deleted_records ADD CONSTRAINT deleted_records_pkey PRIMARY KEY (id);
+ALTER TABLE ONLY idempotency_keys ADD CONSTRAINT idempotency_keys_pkey PRIMARY KEY (key);
+ALTER TABLE ONLY trip_seats ADD CONSTRAINT trip_seats_pkey PRIMARY KEY (schedule_id, trip_date);
 ALTER TABLE ONLY shuttle_registrations ADD CONSTRAINT shuttle_registrations_pkey PRIMARY KEY (id);
 ALTER TABLE ONLY shuttle_schedules ADD CONSTRAINT shuttle_schedules_pkey PRIMARY KEY (id);
+ALTER TABLE ONLY standing_registrations ADD CONSTRAINT standing_registrations_pkey PRIMARY KEY (id);
 ALTER TABLE ONLY shuttles ADD CONSTRAINT shuttles_pkey PRIMARY KEY (id);
 
 -- Add foreign key constraints
 ALTER TABLE ONLY csv_processing_logs ADD CONSTRAINT csv_processing_logs_shuttle_id_fkey FOREIGN KEY (shuttle_id) REFERENCES shuttles(id) ON DELETE CASCADE;
+ALTER TABLE ONLY trip_seats ADD CONSTRAINT trip_seats_schedule_id_fkey FOREIGN KEY (schedule_id) REFERENCES shuttle_schedules(id) ON DELETE CASCADE;
 ALTER TABLE ONLY shuttle_registrations ADD CONSTRAINT shuttle_registrations_schedule_id_fkey FOREIGN KEY (schedule_id) REFERENCES shuttle_schedules(id) ON DELETE CASCADE;
+ALTER TABLE ONLY standing_registrations ADD CONSTRAINT standing_registrations_schedule_id_fkey FOREIGN KEY (schedule_id) REFERENCES shuttle_schedules(id) ON DELETE CASCADE;
 ALTER TABLE ONLY shuttle_schedules ADD CONSTRAINT shuttle_schedules_shuttle_id_fkey FOREIGN KEY (shuttle_id) REFERENCES shuttles(id) ON DELETE CASCADE;
 ALTER TABLE ONLY shuttles ADD CONSTRAINT shuttles_company_id_fkey FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE;
 
@@ -149,9 +232,35 @@ CREATE INDEX IF NOT EXISTS idx_shuttles_company_id ON shuttles USING btree (comp
 CREATE INDEX IF NOT EXISTS idx_shuttles_shuttle_number ON shuttles USING btree (shuttle_number);
 CREATE INDEX IF NOT EXISTS idx_shuttle_schedules_shuttle_id ON shuttle_schedules USING btree (shuttle_id);
 CREATE INDEX IF NOT EXISTS idx_shuttle_schedules_route_direction ON shuttle_schedules USING btree (route_type, direction);
+CREATE INDEX IF NOT EXISTS idx_shuttle_schedules_days_of_week ON shuttle_schedules USING gin (days_of_week);
 CREATE INDEX IF NOT EXISTS idx_shuttle_registrations_schedule_id ON shuttle_registrations USING btree (schedule_id);
 CREATE INDEX IF NOT EXISTS idx_shuttle_registrations_date ON shuttle_registrations USING btree (registration_date);
+CREATE INDEX IF NOT EXISTS idx_shuttle_registrations_schedule_date ON shuttle_registrations USING btree (schedule_id, registration_date) WHERE ((status)::text = 'confirmed'::text);
 CREATE INDEX IF NOT EXISTS idx_admin_users_email ON admin_users USING btree (email);
+CREATE INDEX IF NOT EXISTS idx_companies_updated_at ON companies USING btree (updated_at);
+CREATE INDEX IF NOT EXISTS idx_shuttles_updated_at ON shuttles USING btree (updated_at);
+CREATE INDEX IF NOT EXISTS idx_shuttle_schedules_updated_at ON shuttle_schedules USING btree (updated_at);
+CREATE INDEX IF NOT EXISTS idx_shuttle_registrations_updated_at ON shuttle_registrations USING btree (updated_at);
+CREATE INDEX IF NOT EXISTS idx_shuttle_registrations_time_id ON shuttle_registrations USING btree (registration_time, id);
+DROP INDEX IF EXISTS idx_shuttle_registrations_phone;
+CREATE INDEX IF NOT EXISTS idx_shuttle_registrations_phone_time_id ON shuttle_registrations USING btree (passenger_phone_normalized, registration_time, id);
+
+-- Drop duplicate registrations (keeping the confirmed, then the earliest one) before enforcing the trip key
+DELETE FROM shuttle_registrations r USING (
+    SELECT id, row_number() OVER (
+        PARTITION BY schedule_id, registration_date, passenger_phone_normalized
+        ORDER BY ((status)::text = 'confirmed'::text) DESC, registration_time, id
+    ) AS duplicate_rank
+    FROM shuttle_registrations
+) d
+WHERE r.id = d.id AND d.duplicate_rank > 1;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_registrations_trip ON shuttle_registrations USING btree (schedule_id, registration_date, passenger_phone_normalized);
+CREATE INDEX IF NOT EXISTS idx_shuttle_registrations_waitlist ON shuttle_registrations USING btree (schedule_id, registration_date, registration_time, id) WHERE ((status)::text = 'waitlisted'::text);
+CREATE INDEX IF NOT EXISTS idx_deleted_records_deleted_at ON deleted_records USING btree (deleted_at);
+CREATE INDEX IF NOT EXISTS idx_csv_processing_logs_shuttle_created ON csv_processing_logs USING btree (shuttle_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_csv_processing_logs_unfinished ON csv_processing_logs USING btree (heartbeat_at) WHERE ((status)::text = ANY ((ARRAY['pending'::character varying, 'processing'::character varying])::text[]));
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON idempotency_keys USING btree (created_at);
+CREATE INDEX IF NOT EXISTS idx_standing_registrations_schedule_active ON standing_registrations USING btree (schedule_id, start_date) WHERE ((status)::text = 'active'::text);
 
 -- Add update triggers to all tables
 DROP TRIGGER IF EXISTS update_admin_users_updated_at ON admin_users;
@@ -172,6 +281,38 @@ CREATE TRIGGER update_shuttle_schedules_updated_at BEFORE UPDATE ON shuttle_sche
 DROP TRIGGER IF EXISTS update_shuttles_updated_at ON shuttles;
 CREATE TRIGGER update_shuttles_updated_at BEFORE UPDATE ON shuttles FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+DROP TRIGGER IF EXISTS update_standing_registrations_updated_at ON standing_registrations;
+CREATE TRIGGER update_standing_registrations_updated_at BEFORE UPDATE ON standing_registrations FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Add change notification triggers for the backend change feed
+DROP TRIGGER IF EXISTS notify_companies_change ON companies;
+CREATE TRIGGER notify_companies_change AFTER INSERT OR UPDATE OR DELETE ON companies FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+DROP TRIGGER IF EXISTS notify_shuttles_change ON shuttles;
+CREATE TRIGGER notify_shuttles_change AFTER INSERT OR UPDATE OR DELETE ON shuttles FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+DROP TRIGGER IF EXISTS notify_shuttle_schedules_change ON shuttle_schedules;
+CREATE TRIGGER notify_shuttle_schedules_change AFTER INSERT OR UPDATE OR DELETE ON shuttle_schedules FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+DROP TRIGGER IF EXISTS notify_shuttle_registrations_change ON shuttle_registrations;
+CREATE TRIGGER notify_shuttle_registrations_change AFTER INSERT OR UPDATE OR DELETE ON shuttle_registrations FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+DROP TRIGGER IF EXISTS notify_standing_registrations_change ON standing_registrations;
+CREATE TRIGGER notify_standing_registrations_change AFTER INSERT OR UPDATE OR DELETE ON standing_registrations FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+-- Add tombstone triggers for delta sync
+DROP TRIGGER IF EXISTS record_companies_deletion ON companies;
+CREATE TRIGGER record_companies_deletion AFTER DELETE ON companies FOR EACH ROW EXECUTE FUNCTION record_deletion();
+
+DROP TRIGGER IF EXISTS record_shuttles_deletion ON shuttles;
+CREATE TRIGGER record_shuttles_deletion AFTER DELETE ON shuttles FOR EACH ROW EXECUTE FUNCTION record_deletion();
+
+DROP TRIGGER IF EXISTS record_shuttle_schedules_deletion ON shuttle_schedules;
+CREATE TRIGGER record_shuttle_schedules_deletion AFTER DELETE ON shuttle_schedules FOR EACH ROW EXECUTE FUNCTION record_deletion();
+
+DROP TRIGGER IF EXISTS record_shuttle_registrations_deletion ON shuttle_registrations;
+CREATE TRIGGER record_shuttle_registrations_deletion AFTER DELETE ON shuttle_registrations FOR EACH ROW EXECUTE FUNCTION record_deletion();
+
 -- Insert production admin users (based on current data)
 INSERT INTO admin_users (id, email, password_hash, full_name, role, is_active, last_login, created_at, updated_at, refresh_token) VALUES 
 ('70cf1b94-15cc-44e9-83a3-aed4a32aa8f0', 'admin@tzafrir.com', '$2a$06$lKkJ7IcDxJEriAFCzLhh0OnrlC/HXbLLZMh71dA5aKUxiPgxhqy7O', 'System Administrator', 'super_admin', true, NULL, '2025-08-28 14:59:15.521408+00', '2025-08-28 14:59:15.521408+00', NULL),
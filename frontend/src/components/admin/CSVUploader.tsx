@@ -5,7 +5,31 @@ import { Label } from '@/components/ui/label';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Upload, FileText, CheckCircle, XCircle, Loader2 } from 'lucide-react';
 import { toast } from 'sonner';
-import { dataService } from '@/services/dataService';
+import { dataService, CSVProcessingLog } from '@/services/dataService';
+
+const JOB_POLL_INTERVAL_MS = 2000;
+// Give up when a job makes no progress for this long
+const JOB_STALL_TIMEOUT_MS = 5 * 60 * 1000;
+
+// Imports run in the background; poll the job until it is done
+async function waitForJob(jobId: string): Promise<CSVProcessingLog> {
+  let lastProgress = '';
+  let deadline = Date.now() + JOB_STALL_TIMEOUT_MS;
+  while (true) {
+    const job = await dataService.csv.getJob(jobId);
+    if (job.status === 'success' || job.status === 'error') {
+      return job;
+    }
+    const progress = `${job.status}:${job.processed_rows}`;
+    if (progress !== lastProgress) {
+      lastProgress = progress;
+      deadline = Date.now() + JOB_STALL_TIMEOUT_MS;
+    } else if (Date.now() > deadline) {
+      throw new Error('העיבוד לא הסתיים בזמן, נסו לבדוק את מצב הקובץ מאוחר יותר');
+    }
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+}
 
 interface CSVUploaderProps {
   shuttleId: string;
@@ -40,10 +64,16 @@ export function CSVUploader({ shuttleId, shuttleName, currentStatus, onUploadCom
     setProcessing(true);
     
     try {
-      // Upload and process file in one step using our backend API
-      const result = await dataService.csv.uploadAndProcess(shuttleId, file);
+      // Upload the file and queue it for processing
+      const job = await dataService.csv.uploadAndProcess(shuttleId, file);
+      setUploading(false);
+
+      const result = await waitForJob(job.job_id);
+      if (result.status === 'error') {
+        throw new Error(result.error_message || 'שגיאה בעיבוד');
+      }
 
-      toast.success(`הקובץ עובד בהצלחה! עובדו ${result.processed_records} רשומות`);
+      toast.success(`הקובץ עובד בהצלחה! עובדו ${result.processed_rows} רשומות`);
       setFile(null);
       onUploadComplete?.();
 
@@ -89,6 +89,23 @@ export interface ShuttleRegistration {
   updated_at: string;
 }
 
+export interface CSVJob {
+  job_id: string;
+  status: string;
+  filename: string;
+}
+
+export interface CSVProcessingLog {
+  id: string;
+  shuttle_id: string;
+  csv_file_name: string;
+  status: string;
+  error_message?: string;
+  processed_rows: number;
+  created_at: string;
+  updated_at: string;
+}
+
 export const dataService = {
   // Companies
   companies: {
@@ -187,7 +204,24 @@ export const dataService = {
     },
 
     async getByDate(date: string): Promise<ShuttleRegistration[]> {
-      return api.get(`/api/registrations?date=${date}`);
+      const registrations: ShuttleRegistration[] = [];
+      let cursor: string | null = null;
+      do {
+        const queryParams = new URLSearchParams({ date });
+        if (cursor) queryParams.append('cursor', cursor);
+        const page: { items: ShuttleRegistration[]; next_cursor: string | null } = await api.get(`/api/registrations/?${queryParams}`);
+        registrations.push(...page.items);
+        cursor = page.next_cursor;
+      } while (cursor);
+      return registrations;
+    },
+
+    async getPage(params: { date?: string; schedule_id?: string; route_type?: string; status?: string; phone?: string; cursor?: string; limit?: number; include_total?: boolean }): Promise<{ items: ShuttleRegistration[]; next_cursor: string | null; total_estimate: number | null }> {
+      const queryParams = new URLSearchParams();
+      Object.entries(params).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') queryParams.append(key, String(value));
+      });
+      return api.get(`/api/registrations/?${queryParams}`);
     },
 
     async create(registration: Partial<ShuttleRegistration>): Promise<ShuttleRegistration> {
@@ -211,6 +245,11 @@ export const dataService = {
       if (params.registration_date) queryParams.append('registration_date', params.registration_date);
       
       return api.getPublic(`/api/registrations/count/public?${queryParams}`);
+    },
+
+    async getSlotCounts(registrationDate?: string): Promise<{ route_type: string; direction: string; time_slot: string; count: number }[]> {
+      const queryParams = registrationDate ? `?registration_date=${registrationDate}` : '';
+      return api.getPublic(`/api/registrations/count/public/slots${queryParams}`);
     }
   },
 
@@ -224,11 +263,11 @@ export const dataService = {
       return api.uploadFile('/api/csv/upload', formData);
     },
 
-    async processFile(shuttleId: string, filePath: string): Promise<{ success: boolean; processed_records: number }> {
+    async processFile(shuttleId: string, filePath: string): Promise<CSVJob> {
       return api.post('/api/csv/process', { shuttle_id: shuttleId, file_path: filePath });
     },
 
-    async uploadAndProcess(shuttleId: string, file: File): Promise<{ success: boolean; processed_records: number; filename: string }> {
+    async uploadAndProcess(shuttleId: string, file: File): Promise<CSVJob> {
       const formData = new FormData();
       formData.append('csvFile', file);
       formData.append('shuttle_id', shuttleId);
@@ -236,7 +275,11 @@ export const dataService = {
       return api.uploadFile('/api/csv/upload-and-process', formData);
     },
 
-    async getProcessingLogs(shuttleId: string): Promise<any[]> {
+    async getJob(jobId: string): Promise<CSVProcessingLog> {
+      return api.get(`/api/csv/jobs/${jobId}`);
+    },
+
+    async getProcessingLogs(shuttleId: string): Promise<CSVProcessingLog[]> {
       return api.get(`/api/csv/logs/${shuttleId}`);
     },
 